@@ -0,0 +1,177 @@
+import random
+import time
+from array import array
+import numpy as np
+from cube.cube import MagicCube
+from reporting.progress import default_progress
+from reporting.render import render_plot
+from reporting.trajectory import make_recorder
+
+class BatchedSimulatedAnnealing:
+    """K independent annealing chains advanced in lock step.
+
+    Chain states are the rows of one (K x n^3) matrix and their line sums the rows of a
+    (K x lines) matrix. Each step draws one swap per chain, scores all of them at once
+    from a cell-line incidence matrix, runs the Metropolis tests and cools every chain
+    with numpy operations, so Python overhead is paid once per step instead of once per
+    chain. initial_temp and cooling_rate may be scalars or one value per chain; a chain
+    stops when it is cold or solved, the others carry on.
+    """
+
+    def __init__(self, magic_cube, initial_temp, cooling_rate, chains=None, min_temp=1e-10, time_limit=None,
+                 progress=None, trajectory=None):
+        initial_temp = np.asarray(initial_temp, dtype=np.float64)
+        cooling_rate = np.asarray(cooling_rate, dtype=np.float64)
+        if chains is None:
+            chains = max(initial_temp.size, cooling_rate.size)
+        self.magic_cube = magic_cube
+        self.chains = chains
+        self.initial_temps = np.broadcast_to(initial_temp, (chains,)).copy()
+        self.cooling_rates = np.broadcast_to(cooling_rate, (chains,)).copy()
+        self.min_temp = min_temp
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
+        # Drawn from the random module so a seeded run stays reproducible
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        # incidence[cell, line] is 1 when the line runs through the cell
+        self.line_cells = magic_cube.line_index.line_matrix()
+        self.incidence = magic_cube.line_index.incidence()
+        self.iterations = 0
+        self.chain_iterations = None
+        self.best_objectives = None
+        self.best_states = None
+        self.start_time = None
+        self.end_time = None
+        self.best_values = make_recorder(trajectory, 'best_values', 'q')
+        self.mean_values = make_recorder(trajectory, 'mean_values', 'd')
+        self.final_cube = None
+        self.final_objective = None
+
+    def initialize_states(self):
+        """One random permutation of 1..n^3 per chain."""
+        n_cells = self.magic_cube.size ** 3
+        ordered = np.tile(np.arange(1, n_cells + 1, dtype=np.int32), (self.chains, 1))
+        return self.rng.permuted(ordered, axis=1)
+
+    def run(self):
+        magic_number = self.magic_cube.magic_number
+        n_cells = self.magic_cube.size ** 3
+        chains = np.arange(self.chains)
+        states = self.initialize_states()
+        line_sums = states[:, self.line_cells].sum(axis=2)
+        objectives = np.abs(line_sums - magic_number).sum(axis=1)
+        temps = self.initial_temps.copy()
+        active = np.ones(self.chains, dtype=bool)
+        self.chain_iterations = np.zeros(self.chains, dtype=np.int64)
+        self.best_objectives = objectives.copy()
+        self.best_states = states.copy()
+
+        self.start_time = time.time()
+        while active.any():
+            if self.time_limit is not None and time.time() - self.start_time >= self.time_limit:
+                break
+            self.iterations += 1
+
+            # One random swap of two distinct cells per chain
+            first = self.rng.integers(n_cells, size=self.chains)
+            second = self.rng.integers(n_cells - 1, size=self.chains)
+            second += second >= first
+            values1 = states[chains, first]
+            values2 = states[chains, second]
+
+            # Lines through both cells cancel out in the incidence difference
+            changes = (values2 - values1)[:, None] * (self.incidence[first] - self.incidence[second])
+            new_sums = line_sums + changes
+            deltas = np.abs(new_sums - magic_number).sum(axis=1) - objectives
+
+            # Metropolis test; improving moves always pass since exp(0) is 1
+            probabilities = np.exp(-np.maximum(deltas, 0) / temps)
+            accepted = np.flatnonzero(active & (self.rng.random(self.chains) < probabilities))
+            states[accepted, first[accepted]] = values2[accepted]
+            states[accepted, second[accepted]] = values1[accepted]
+            line_sums[accepted] = new_sums[accepted]
+            objectives[accepted] += deltas[accepted]
+
+            improved = np.flatnonzero(objectives < self.best_objectives)
+            self.best_objectives[improved] = objectives[improved]
+            self.best_states[improved] = states[improved]
+
+            self.chain_iterations += active
+            temps[active] *= self.cooling_rates[active]
+            active &= (temps >= self.min_temp) & (self.best_objectives > 0)
+
+            best_value = int(self.best_objectives.min())
+            self.best_values.record(best_value)
+            self.mean_values.record(float(objectives.mean()))
+            if self.progress.due():
+                self.progress.emit('iteration', self.iterations, best_objective=best_value,
+                                   mean_objective=float(objectives.mean()), active_chains=int(active.sum()),
+                                   time=time.time() - self.start_time)
+
+        self.end_time = time.time()
+        best_chain = int(np.argmin(self.best_objectives))
+        self.final_cube = array('H', self.best_states[best_chain].tolist())
+        self.final_objective = int(self.best_objectives[best_chain])
+        # Leave the cube in the best state any chain found
+        self.magic_cube.restore(self.final_cube)
+        self.best_values.close()
+        self.mean_values.close()
+        self.progress.flush()
+
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        return {
+            'algorithm': 'batched_simulated_annealing',
+            'final_objective': self.final_objective,
+            'iterations': self.iterations,
+            'chains': self.chains,
+            'chain_best_objectives': self.best_objectives.tolist(),
+            'chain_iterations': self.chain_iterations.tolist(),
+            'initial_temps': self.initial_temps.tolist(),
+            'cooling_rates': self.cooling_rates.tolist(),
+            'duration': self.end_time - self.start_time,
+            'final_state': list(self.final_cube),
+        }
+
+    def plot_spec(self):
+        """Describe the best and mean objective plot as plain data for reporting.render."""
+        best_steps, best_values = self.best_values.series()
+        mean_steps, mean_values = self.mean_values.series()
+        return {
+            'name': 'batched_simulated_annealing',
+            'figsize': [10, 6],
+            'panels': [{
+                'title': 'Objective Function Value over Iterations',
+                'xlabel': 'Iterations',
+                'ylabel': 'Objective Function Value',
+                'grid': True,
+                'legend': True,
+                'lines': [
+                    {'x': best_steps, 'y': best_values, 'label': 'Best of All Chains'},
+                    {'x': mean_steps, 'y': mean_values, 'label': 'Mean Current Objective'},
+                ],
+            }],
+        }
+
+    def report(self, show=None):
+        """Display the overall and per-chain results and plot the progress."""
+        print("\nExperiment Report:")
+        print(f"Final State: {self.magic_cube.to_nested(self.final_cube)}")
+        print(f"Final Objective Value: {self.final_objective}")
+        print(f"Chains: {self.chains}")
+        for chain in range(self.chains):
+            print(f"Chain {chain + 1}: T0 = {self.initial_temps[chain]}, cooling rate = {self.cooling_rates[chain]}, "
+                  f"best objective = {self.best_objectives[chain]}, iterations = {self.chain_iterations[chain]}")
+        print(f"Total Iterations: {self.iterations}")
+        print(f"Duration: {self.end_time - self.start_time:.4f} seconds")
+
+        render_plot(self.plot_spec(), show=show)
+
+
+if __name__ == "__main__":
+    cube = MagicCube(size=5)
+    # A small sweep: every combination of four starting temperatures and four cooling rates
+    temps, rates = np.meshgrid([10.0, 100.0, 1000.0, 10000.0], [0.999, 0.9995, 0.9999, 0.99995])
+    annealer = BatchedSimulatedAnnealing(cube, temps.ravel(), rates.ravel())
+    annealer.run()
+    annealer.report()
@@ -0,0 +1,62 @@
+import os
+import pickle
+import time
+
+class Checkpointer:
+    """Periodically saves a run's state to one file, every N steps or every T seconds.
+
+    Snapshots are pickled with the highest protocol, which stores array buffers as raw
+    bytes. Each save goes to a temporary file that is synced to disk and then renamed
+    over the checkpoint, so a preempted write never leaves a torn snapshot behind.
+    """
+
+    def __init__(self, path, every=None, seconds=None):
+        if every is not None and seconds is not None:
+            raise ValueError("Checkpoint either every N steps or every T seconds, not both.")
+        if every is None and seconds is None:
+            seconds = 60.0
+        self.path = path
+        self.every = every
+        self.seconds = seconds
+        self.countdown = every
+        self.next_time = time.monotonic() + seconds if seconds is not None else None
+        self.saves = 0
+
+    def due(self):
+        """Return True when the current step should be checkpointed."""
+        if self.seconds is not None:
+            now = time.monotonic()
+            if now < self.next_time:
+                return False
+            self.next_time = now + self.seconds
+            return True
+        self.countdown -= 1
+        if self.countdown > 0:
+            return False
+        self.countdown = self.every
+        return True
+
+    def save(self, state):
+        """Atomically replace the checkpoint file with state."""
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+        self.saves += 1
+
+    def load(self, algorithm):
+        """Return the saved state for the named algorithm, or None when there is no checkpoint yet."""
+        state = load_checkpoint(self.path)
+        if state is not None and state['algorithm'] != algorithm:
+            raise ValueError(f"Checkpoint {self.path} belongs to {state['algorithm']}, not {algorithm}.")
+        return state
+
+
+def load_checkpoint(path):
+    """Read a checkpoint written by Checkpointer.save, or return None if the file does not exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        return pickle.load(file)
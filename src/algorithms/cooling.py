@@ -0,0 +1,196 @@
+import math
+
+# Default final temperature when a budget is given. Swap deltas are whole numbers of a few units, so a
+# final temperature of about one still accepts small uphill moves late in the run instead of freezing early
+BUDGET_FINAL_TEMP = 1.0
+
+class CoolingSchedule:
+    """How an annealer's temperature falls from step to step.
+
+    Without a budget a schedule cools by its own rule until the temperature drops below
+    final_temp. With a budget, SimulatedAnnealing passes the fraction of the budget used
+    so far and the schedule scales itself to reach final_temp exactly when it runs out.
+    Schedules with needs_budget cool too slowly to ever reach final_temp on their own.
+    """
+
+    name = None
+    needs_budget = False
+
+    def start(self, initial_temp, final_temp):
+        self.initial_temp = initial_temp
+        self.final_temp = final_temp
+        self.steps = 0
+
+    def next_temperature(self, temp, accepted, improved, fraction=None):
+        """Return the temperature for the next step; fraction is the budget used, or None."""
+        self.steps += 1
+        if fraction is None:
+            return self.cool(temp)
+        return self.at(fraction)
+
+    def cool(self, temp):
+        raise NotImplementedError
+
+    def at(self, fraction):
+        """Temperature after the given fraction of the budget."""
+        raise NotImplementedError
+
+    def finished(self, temp):
+        return temp < self.final_temp
+
+
+class GeometricCooling(CoolingSchedule):
+    """T <- rate * T; over a budget T decays exponentially from the initial to the final temperature."""
+
+    name = 'geometric'
+
+    def __init__(self, rate=0.95):
+        self.rate = rate
+
+    def cool(self, temp):
+        return temp * self.rate
+
+    def at(self, fraction):
+        return self.initial_temp * (self.final_temp / self.initial_temp) ** fraction
+
+
+class LinearCooling(CoolingSchedule):
+    """T <- T - decrement; over a budget T falls in a straight line."""
+
+    name = 'linear'
+
+    def __init__(self, decrement=1.0):
+        self.decrement = decrement
+
+    def cool(self, temp):
+        return temp - self.decrement
+
+    def at(self, fraction):
+        return self.initial_temp + (self.final_temp - self.initial_temp) * fraction
+
+
+class LogarithmicCooling(CoolingSchedule):
+    """T_k = T0 / (1 + scale * ln(1 + k)), which cools too slowly to be run without a budget."""
+
+    name = 'logarithmic'
+    # Reaching T0 / final_temp would take about exp(T0 / final_temp) steps
+    needs_budget = True
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+
+    def cool(self, temp):
+        return self.initial_temp / (1 + self.scale * math.log1p(self.steps))
+
+    def at(self, fraction):
+        # ln(1 + (e - 1) * fraction) runs from 0 to 1 over the budget
+        return self.initial_temp / (1 + (self.initial_temp / self.final_temp - 1) * math.log1p((math.e - 1) * fraction))
+
+
+class LundyMeesCooling(CoolingSchedule):
+    """Lundy-Mees: T <- T / (1 + beta * T), so 1/T grows by beta every step; it needs a budget."""
+
+    name = 'lundy-mees'
+    # Reaching final_temp would take about 1 / (beta * final_temp) steps
+    needs_budget = True
+
+    def __init__(self, beta=1e-3):
+        self.beta = beta
+
+    def cool(self, temp):
+        return temp / (1 + self.beta * temp)
+
+    def at(self, fraction):
+        return 1 / (1 / self.initial_temp + (1 / self.final_temp - 1 / self.initial_temp) * fraction)
+
+
+class AdaptiveCooling(CoolingSchedule):
+    """Steer the temperature so the share of accepted moves follows a falling target.
+
+    Every window moves the acceptance rate is compared with the target: too few acceptances
+    heat the chain up, too many cool it down. The target decays geometrically from
+    start_acceptance to end_acceptance, per window or over the budget. After reheat_after
+    windows without a new best state the temperature jumps back to reheat * T0.
+
+    With a budget a window is a 1 / budget_windows share of it instead of window moves, and
+    the temperature is held under T0 * (final_temp / T0) ** fraction**2, a ceiling that
+    closes on final_temp as the budget runs out.
+    """
+
+    name = 'adaptive'
+
+    def __init__(self, start_acceptance=0.5, end_acceptance=0.001, window=1000, decay=0.99, step=1.2,
+                 reheat_after=50, reheat=0.5, budget_windows=200):
+        self.start_acceptance = start_acceptance
+        self.end_acceptance = end_acceptance
+        self.window = window
+        self.decay = decay
+        self.step = step
+        self.reheat_after = reheat_after
+        self.reheat = reheat
+        self.budget_windows = budget_windows
+
+    def start(self, initial_temp, final_temp):
+        super().start(initial_temp, final_temp)
+        self.target = self.start_acceptance
+        self.accepted = 0
+        self.window_steps = 0
+        self.window_end = 1 / self.budget_windows
+        self.improved = False
+        self.stale_windows = 0
+        self.reheats = 0
+
+    def next_temperature(self, temp, accepted, improved, fraction=None):
+        self.steps += 1
+        self.window_steps += 1
+        self.accepted += accepted
+        self.improved |= improved
+        if fraction is None:
+            if self.window_steps < self.window:
+                return temp
+            self.target *= self.decay
+            return self.adjust(temp)
+
+        if fraction >= self.window_end:
+            self.window_end = (math.floor(fraction * self.budget_windows) + 1) / self.budget_windows
+            self.target = self.start_acceptance * (self.end_acceptance / self.start_acceptance) ** fraction
+            temp = self.adjust(temp)
+        ceiling = self.initial_temp * (self.final_temp / self.initial_temp) ** (fraction * fraction)
+        return max(self.final_temp, min(temp, ceiling))
+
+    def adjust(self, temp):
+        """Close a window: move the temperature by one step towards the target acceptance rate."""
+        rate = self.accepted / self.window_steps
+        temp = temp * self.step if rate < self.target else temp / self.step
+
+        self.stale_windows = 0 if self.improved else self.stale_windows + 1
+        if self.stale_windows >= self.reheat_after:
+            temp = max(temp, self.reheat * self.initial_temp)
+            self.stale_windows = 0
+            self.reheats += 1
+        self.accepted = 0
+        self.window_steps = 0
+        self.improved = False
+        return temp
+
+    def finished(self, temp):
+        return self.target < self.end_acceptance
+
+
+SCHEDULES = {schedule.name: schedule for schedule in
+             (GeometricCooling, LinearCooling, LogarithmicCooling, LundyMeesCooling, AdaptiveCooling)}
+
+def make_schedule(schedule, cooling_rate=None):
+    """Return a schedule object from a name in SCHEDULES, or the object itself.
+
+    cooling_rate keeps the historical meaning of the geometric rate.
+    """
+    if schedule is None:
+        schedule = 'geometric'
+    if not isinstance(schedule, str):
+        return schedule
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Unknown cooling schedule '{schedule}'. Choose one of: {', '.join(SCHEDULES)}.")
+    if schedule == 'geometric' and cooling_rate is not None:
+        return GeometricCooling(cooling_rate)
+    return SCHEDULES[schedule]()
@@ -1,17 +1,47 @@
-import matplotlib.pyplot as plt
 import time
 import random
-import copy
-import datetime
+from array import array
+import numpy as np
 from cube.cube import MagicCube
+from cube.symmetry import SymmetryTable
+from reporting.progress import default_progress
+from reporting.render import render_plot
 
 class GeneticAlgorithm:
-    def __init__(self, magic_cube, amount_iteration, population_size, mutation_rate=0.01):
+    """Generational GA over a packed population matrix.
+
+    The population is one (population_size x n^3) integer matrix, one cube per row, and the
+    whole generation is scored in a single vectorized pass. Selection, order crossover and
+    swap mutation also work on every row at once, and only ever rearrange a row, so every
+    child is a valid permutation of 1..n^3. With deduplicate, children that are rotations,
+    reflections or complements of an earlier child are mutated until the generation holds
+    no two equivalent states. It is off by default: canonicalizing every child costs more
+    than half the generation time and selection and crossover rarely produce such copies.
+    """
+
+    # Tags results, plots and checkpoints, so subclasses do not pick up each other's checkpoints
+    name = 'genetic_algorithm'
+
+    def __init__(self, magic_cube, amount_iteration, population_size, mutation_rate=0.01, time_limit=None, progress=None,
+                 checkpoint=None, deduplicate=False, target_value=0):
         self.magic_cube = magic_cube
         self.amount_iteration = amount_iteration
         self.population_size = population_size
         self.mutation_rate = mutation_rate
-        self.population = []
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
+        self.checkpoint = checkpoint
+        # Checked once per generation, after its best individual has been recorded
+        self.target_value = target_value
+        # Drawn from the random module so a seeded run stays reproducible
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.line_cells = magic_cube.line_index.line_matrix()
+        self.symmetry = SymmetryTable.for_size(magic_cube.size) if deduplicate else None
+        self.duplicates_replaced = 0
+        # Individuals scored
+        self.evaluations = 0
+        self.population = None
+        self.fitness = None
         self.best_solution = None
         self.best_objective_value = float('inf')
         self.objective_values_history = []
@@ -22,113 +52,211 @@ class GeneticAlgorithm:
 
     def initialize_population(self):
         """Generate initial population with random cube states."""
-        self.population = [self.magic_cube.initialize_cube() for _ in range(self.population_size)]
-    
+        n_cells = self.magic_cube.size ** 3
+        ordered = np.tile(np.arange(1, n_cells + 1, dtype=np.int32), (self.population_size, 1))
+        self.population = self.rng.permuted(ordered, axis=1)
+
+    def evaluate(self, population):
+        """Objective value of every row of a population matrix, lower is better."""
+        line_sums = population[:, self.line_cells].sum(axis=2)
+        return np.abs(line_sums - self.magic_cube.magic_number).sum(axis=1)
+
     def calculate_fitness(self, individual):
         """Use the objective function directly as fitness, aiming for lower values."""
-        self.magic_cube.data = individual  # Set cube state
-        return self.magic_cube.objective_function()  # Positive values, lower is better
+        return int(self.evaluate(np.asarray(individual, dtype=np.int32)[None, :])[0])
 
     def select_parents(self):
-        """Select two parents using tournament selection, aiming for lower fitness values."""
+        """Pick a parent pair for every child by tournaments of four, returning two row index vectors."""
         tournament_size = min(4, self.population_size)  # Safe tournament size
-        parents = []
-        for _ in range(2):  # Need two parents
-            candidates = random.sample(self.population, tournament_size)
-            parents.append(min(candidates, key=self.calculate_fitness))
-        return parents
-
-    def crossover(self, parent1, parent2):
-        """Perform crossover on two parents, ensuring unique values in each row."""
-        child = []
-        for layer1, layer2 in zip(parent1, parent2):
-            child_layer = []
-            for row1, row2 in zip(layer1, layer2):
-                combined_row = list(set(row1 + row2))
-                random.shuffle(combined_row)
-                child_layer.append(combined_row[:self.magic_cube.size])
-            child.append(child_layer)
-        return child
-
-    def mutate(self, individual):
-        """Mutate an individual by shuffling a row within a layer, maintaining unique values."""
-        if random.random() < self.mutation_rate:
-            layer = random.choice(individual)
-            row = random.choice(layer)
-            random.shuffle(row)
+        contestants = self.rng.integers(self.population_size, size=(2, self.population_size, tournament_size))
+        winners = np.argmin(self.fitness[contestants], axis=2)
+        parents = np.take_along_axis(contestants, winners[..., None], axis=2)[..., 0]
+        return parents[0], parents[1]
+
+    def crossover(self, parents1, parents2):
+        """Order crossover: keep a random slice of the first parent, fill the rest in the second parent's order."""
+        count, n_cells = parents1.shape
+        cuts = np.sort(self.rng.integers(0, n_cells + 1, size=(count, 2)), axis=1)
+        low, high = cuts[:, :1], cuts[:, 1:]
+        positions = np.arange(n_cells)
+        kept = (positions >= low) & (positions < high)
+
+        # Where each value sits in the first parent tells whether the slice already holds it
+        where_in_first = np.empty((count, n_cells + 1), dtype=np.intp)
+        np.put_along_axis(where_in_first, parents1, np.broadcast_to(positions, parents1.shape), axis=1)
+        from_second = np.take_along_axis(where_in_first, parents2, axis=1)
+        missing = (from_second < low) | (from_second >= high)
+
+        children = np.where(kept, parents1, 0)
+        # Both masks select the same number of cells per row, and boolean indexing keeps row order
+        children[~kept] = parents2[missing]
+        return children
+
+    def mutate(self, population):
+        """Swap two random cells in each individual picked with probability mutation_rate."""
+        self.swap_cells(population, np.flatnonzero(self.rng.random(len(population)) < self.mutation_rate))
+
+    def swap_cells(self, population, rows):
+        """Swap two distinct random cells in each of the given rows."""
+        n_cells = population.shape[1]
+        first = self.rng.integers(n_cells, size=len(rows))
+        second = (first + 1 + self.rng.integers(n_cells - 1, size=len(rows))) % n_cells
+        population[rows, first], population[rows, second] = population[rows, second], population[rows, first]
 
     def evolve_population(self):
         """Create a new population through selection, crossover, and mutation."""
-        new_population = []
-        while len(new_population) < self.population_size:
-            parent1, parent2 = self.select_parents()
-            child = self.crossover(parent1, parent2)
-            self.mutate(child)
-            new_population.append(child)
-        self.population = new_population
-
-    def run(self):
-        """Run the genetic algorithm to optimize the magic cube."""
-        self.start_time = time.time()
-        self.initialize_population()
-        self.initial_state = copy.deepcopy(self.magic_cube.data)
-
-        for iteration in range(self.amount_iteration):
-            fitness_values = [self.calculate_fitness(individual) for individual in self.population]
-            best_index = fitness_values.index(min(fitness_values))
-            best_fitness = fitness_values[best_index]
+        parents1, parents2 = self.select_parents()
+        children = self.crossover(self.population[parents1], self.population[parents2])
+        self.mutate(children)
+        if self.symmetry is not None:
+            self.replace_duplicates(children)
+        self.population = children
+        # Children are scored at the start of the next generation
+        self.fitness = None
+
+    def replace_duplicates(self, population, max_rounds=3):
+        """Mutate every row equivalent to an earlier row under the cube's symmetries, in place."""
+        for _ in range(max_rounds):
+            hashes = self.symmetry.canonical_hashes(population)
+            _, first = np.unique(hashes, return_index=True)
+            duplicate = np.ones(len(population), dtype=bool)
+            duplicate[first] = False
+            rows = np.flatnonzero(duplicate)
+            if not len(rows):
+                return
+            self.duplicates_replaced += len(rows)
+            # One swap almost always breaks the tie; the check is repeated for the rare case it does not
+            self.swap_cells(population, rows)
+
+    def evolve(self, generations, first_iteration=0):
+        """Evaluate and evolve the current population for a number of generations."""
+        for iteration in range(first_iteration, first_iteration + generations):
+            if self.time_limit is not None and time.time() - self.start_time >= self.time_limit:
+                break
+
+            # Scored once here, unless evolve_population already knows the scores; selection reuses the vector
+            if self.fitness is None:
+                self.fitness = self.evaluate(self.population)
+                self.evaluations += len(self.population)
+            best_index = int(np.argmin(self.fitness))
+            best_fitness = int(self.fitness[best_index])
 
             if best_fitness < self.best_objective_value:
                 self.best_objective_value = best_fitness
-                self.best_solution = self.population[best_index]
+                self.best_solution = array('H', self.population[best_index].tolist())
 
-            avg_fitness = sum(fitness_values) / self.population_size
+            avg_fitness = float(self.fitness.mean())
             self.objective_values_history.append((iteration, best_fitness, avg_fitness))
             
-            elapsed_time = time.time() - self.start_time
-            print(f"Iteration {iteration}: Best Objective = {best_fitness}, Average Objective = {avg_fitness}, Time = {elapsed_time:.4f} seconds")
+            if self.progress.due():
+                self.progress.emit('iteration', iteration, best_objective=best_fitness,
+                                   average_objective=avg_fitness, time=time.time() - self.start_time)
+
+            if self.best_objective_value <= self.target_value:
+                break
 
             self.evolve_population()
 
+            if self.checkpoint is not None and self.checkpoint.due():
+                self.save_checkpoint(iteration + 1)
+
+    def save_checkpoint(self, next_iteration):
+        """Write the population and everything else the next generation depends on."""
+        self.checkpoint.save({
+            'algorithm': self.name,
+            'next_iteration': next_iteration,
+            'population': self.population,
+            'fitness': self.fitness,
+            'best_solution': self.best_solution,
+            'best_objective_value': self.best_objective_value,
+            'objective_values_history': self.objective_values_history,
+            'initial_state': self.initial_state,
+            'elapsed': time.time() - self.start_time,
+            'rng_state': self.rng.bit_generator.state,
+            'duplicates_replaced': self.duplicates_replaced,
+            'evaluations': self.evaluations,
+        })
+
+    def run(self, resume=False):
+        """Run the genetic algorithm to optimize the magic cube; resume=True continues from the checkpoint."""
+        state = self.checkpoint.load(self.name) if resume and self.checkpoint is not None else None
+        if state is None:
+            self.start_time = time.time()
+            self.initialize_population()
+            self.initial_state = self.magic_cube.snapshot()
+            first_iteration = 0
+        else:
+            # Durations and the time limit cover the time spent before the checkpoint too
+            self.start_time = time.time() - state['elapsed']
+            self.population = state['population']
+            self.fitness = state.get('fitness')
+            self.best_solution = state['best_solution']
+            self.best_objective_value = state['best_objective_value']
+            self.objective_values_history = state['objective_values_history']
+            self.initial_state = state['initial_state']
+            first_iteration = state['next_iteration']
+            self.rng.bit_generator.state = state['rng_state']
+            self.duplicates_replaced = state.get('duplicates_replaced', 0)
+            self.evaluations = state.get('evaluations', 0)
+
+        self.evolve(self.amount_iteration - first_iteration, first_iteration)
+
         self.end_time = time.time()
         self.final_state = self.best_solution
+        self.progress.flush()
+
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        return {
+            'algorithm': self.name,
+            'final_objective': self.best_objective_value,
+            'iterations': len(self.objective_values_history),
+            'evaluations': self.evaluations,
+            'population_size': self.population_size,
+            'duplicates_replaced': self.duplicates_replaced,
+            'duration': self.end_time - self.start_time,
+            'final_state': None if self.final_state is None else list(self.final_state),
+        }
 
-    def plot_objective_values(self):
-        """Plot the best and average objective values over iterations."""
+    def plot_spec(self):
+        """Describe the best and average objective plot as plain data for reporting.render."""
         # Unpack the data from objective_values_history
         iterations, best_values, avg_values = zip(*self.objective_values_history)
-        
-        # Plot best and average objective values
-        plt.figure()
-        plt.plot(iterations, best_values, label='Best Objective Value')
-        plt.plot(iterations, avg_values, label='Average Objective Value')
-        plt.xlabel('Iterations')
-        plt.ylabel('Objective Function Value')
-        plt.title('Genetic Algorithm Optimization of Magic Cube')
-        plt.grid(True)
-        plt.legend()
-
-        # Generate a timestamp and save the plot
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        plt.savefig(f'src/data/genetic_algorithm_plot_{timestamp}.png', format='png')
-        
-        # Display the plot after saving it
-        plt.show()
-
-
-    def report(self):
+        return {
+            'name': self.name,
+            'panels': [{
+                'title': 'Genetic Algorithm Optimization of Magic Cube',
+                'xlabel': 'Iterations',
+                'ylabel': 'Objective Function Value',
+                'grid': True,
+                'legend': True,
+                'lines': [
+                    {'x': list(iterations), 'y': list(best_values), 'label': 'Best Objective Value'},
+                    {'x': list(iterations), 'y': list(avg_values), 'label': 'Average Objective Value'},
+                ],
+            }],
+        }
+
+    def plot_objective_values(self, show=None):
+        """Plot the best and average objective values over iterations, save it, and display it when possible."""
+        render_plot(self.plot_spec(), show=show)
+
+
+    def report(self, show=None):
         """Display results including initial and final state, objective value, population size, iterations, and duration."""
         duration = self.end_time - self.start_time
         print("Initial State:")
-        print(self.initial_state)
+        print(self.magic_cube.to_nested(self.initial_state))
         print("\nFinal State:")
-        print(self.final_state)
+        print(self.magic_cube.to_nested(self.final_state))
         print(f"\nFinal Objective Value: {self.best_objective_value}")
         print(f"Population Size: {self.population_size}")
         print(f"Iterations: {self.amount_iteration}")
+        if self.symmetry is not None:
+            print(f"Equivalent Children Replaced: {self.duplicates_replaced}")
         print(f"Duration: {duration:.2f} seconds")
 
-        self.plot_objective_values()
+        self.plot_objective_values(show)
 
 if __name__ == "__main__":
     amount_iteration = 100
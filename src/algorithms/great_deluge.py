@@ -0,0 +1,157 @@
+import time
+from cube.cube import MagicCube
+from cube.moves import make_moves
+from reporting.progress import default_progress
+from reporting.render import render_plot
+from reporting.trajectory import make_recorder
+
+class GreatDeluge:
+    """Local search that accepts any move keeping the objective under a falling water level.
+
+    The level starts at initial_level (the starting objective by default) and falls linearly
+    to final_level over the budget: max_evaluations moves, budget_seconds seconds, or
+    whichever runs out first when both are given. Improving moves are always accepted. A step
+    costs one swap score and one comparison, with no exp() call and no temperature to tune.
+    """
+
+    def __init__(self, magic_cube, max_evaluations=1000000, budget_seconds=None, initial_level=None, final_level=0,
+                 time_limit=None, progress=None, trajectory=None, moves=None, target_value=0):
+        if max_evaluations is None and budget_seconds is None:
+            raise ValueError("Great Deluge needs max_evaluations or budget_seconds to set the rain speed.")
+        self.magic_cube = magic_cube
+        # Compared with the best objective before each move; the current one may float above it under the level
+        self.target_value = target_value
+        self.max_evaluations = max_evaluations
+        self.budget_seconds = budget_seconds
+        self.initial_level = initial_level
+        self.final_level = final_level
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
+        # None for uniform swaps, a guided share for cube.moves.GuidedMoves, or a move generator
+        self.moves = make_moves(moves)
+        self.iterations = 0
+        self.start_time = None
+        self.end_time = None
+        # Bounded typed histories; trajectory holds TrajectoryRecorder options
+        self.objective_values = make_recorder(trajectory, 'objective_values', 'q')
+        self.levels = make_recorder(trajectory, 'levels', 'd')
+        self.initial_cube = self.magic_cube.snapshot()
+        self.final_cube = None
+        self.best_objective = None
+        self.final_level_reached = None
+
+    def run(self):
+        """Search until the level has fallen over the whole budget, the time limit passes or the cube is solved."""
+        cube = self.magic_cube
+        self.start_time = time.time()
+        deadline = None if self.time_limit is None else self.start_time + self.time_limit
+        current_objective = cube.objective_function()
+        best_objective = current_objective
+        best_cube = cube.snapshot()
+        start_level = current_objective if self.initial_level is None else self.initial_level
+        drop = start_level - self.final_level
+        level = start_level
+        max_evaluations = self.max_evaluations
+        budget_seconds = self.budget_seconds
+        budget_end = None if budget_seconds is None else self.start_time + budget_seconds
+        propose = self.moves.propose
+        progress = self.progress
+        record_objective = self.objective_values.record
+        record_level = self.levels.record
+        record_objective(current_objective)
+        record_level(level)
+
+        while best_objective > self.target_value:
+            # The fraction of the budget used sets the level; the larger of the two budgets' fractions wins
+            fraction = 0.0
+            if max_evaluations is not None:
+                fraction = self.iterations / max_evaluations
+            if budget_end is not None or deadline is not None:
+                now = time.time()
+                if deadline is not None and now >= deadline:
+                    break
+                if budget_end is not None:
+                    fraction = max(fraction, 1.0 - (budget_end - now) / budget_seconds)
+            if fraction >= 1.0:
+                break
+            level = start_level - drop * fraction
+
+            i, j = propose(cube)
+            delta = cube.swap_delta_at(i, j)
+            if delta <= 0 or current_objective + delta <= level:
+                cube.apply_swap_at(i, j)
+                current_objective += delta
+                if current_objective < best_objective:
+                    best_objective = current_objective
+                    cube.snapshot_into(best_cube)
+            self.iterations += 1
+            record_objective(current_objective)
+            record_level(level)
+
+            if progress.due():
+                progress.emit('iteration', self.iterations, objective=current_objective, level=level,
+                              best_objective=best_objective)
+
+        self.final_cube = best_cube
+        self.best_objective = best_objective
+        self.final_level_reached = level
+        self.end_time = time.time()
+        self.objective_values.close()
+        self.levels.close()
+        progress.flush()
+
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        return {
+            'algorithm': 'great_deluge',
+            'final_objective': self.best_objective,
+            'iterations': self.iterations,
+            # One swap is scored per iteration
+            'evaluations': self.iterations,
+            'final_level': self.final_level_reached,
+            'guided_moves': getattr(self.moves, 'guided_moves', 0),
+            'duration': self.end_time - self.start_time,
+            'final_state': list(self.final_cube),
+        }
+
+    def plot_spec(self):
+        """Describe the objective and water level plot as plain data for reporting.render."""
+        objective_steps, objective_values = self.objective_values.series()
+        level_steps, level_values = self.levels.series()
+        return {
+            'name': 'great_deluge',
+            'figsize': [10, 6],
+            'panels': [{
+                'title': 'Objective Function Value and Water Level over Iterations',
+                'xlabel': 'Iterations',
+                'ylabel': 'Objective Function Value',
+                'grid': True,
+                'legend': True,
+                'lines': [
+                    {'x': objective_steps, 'y': objective_values, 'label': 'Objective Function'},
+                    {'x': level_steps, 'y': level_values, 'label': 'Water Level'},
+                ],
+            }],
+        }
+
+    def report(self, show=None):
+        """Display the results and plot the progress."""
+        print("=== Great Deluge Report ===")
+        print(f"Initial Objective Value: {self.objective_values.first}")
+        print(f"Best Objective Value: {self.best_objective}")
+        print(f"Total Iterations: {self.iterations}")
+        print(f"Final Water Level: {self.final_level_reached:.2f}")
+        print(f"Duration: {self.end_time - self.start_time:.4f} seconds")
+        print("\nInitial State:")
+        print(self.magic_cube.to_nested(self.initial_cube))
+        print("\nFinal State:")
+        print(self.magic_cube.to_nested(self.final_cube))
+
+        render_plot(self.plot_spec(), show=show)
+
+
+if __name__ == "__main__":
+    cube = MagicCube(size=5)
+    great_deluge = GreatDeluge(cube)
+    great_deluge.run()
+    great_deluge.report()
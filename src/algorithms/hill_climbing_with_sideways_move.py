@@ -1,63 +1,72 @@
-import datetime
-import itertools
+import random
 import time
-import copy
-import matplotlib.pyplot as plt
 from cube.cube import MagicCube
+from cube.evaluation_cache import EvaluationCache
+from cube.neighborhood import NeighborhoodEvaluator, SwapDeltaTable
+from reporting.progress import default_progress
+from reporting.render import render_plot
+from reporting.trajectory import make_recorder
 
 class HillClimbingWithSidewaysMove:
-    def __init__(self, magic_cube, max_sideways):
+    def __init__(self, magic_cube, max_sideways, incremental=False, time_limit=None, progress=None,
+                 trajectory=None, cache=None, target_value=0):
         self.magic_cube = magic_cube
+        # Checked before each neighbourhood scan; a climb never worsens, so current and best are the same
+        self.target_value = target_value
+        self.incremental = incremental
+        # Plateau walks come back to states they have scanned; remember the scans by state hash
+        self.cache = EvaluationCache(10000) if cache is None else cache
         self.max_sideways = max_sideways
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
         self.iterations = 0
         self.sideways_moves = 0
         self.start_time = None
         self.end_time = None
-        self.objective_values = []
-        self.initial_cube = copy.deepcopy(self.magic_cube.data)
+        self.objective_values = make_recorder(trajectory, 'objective_values', 'q')
+        self.initial_cube = self.magic_cube.snapshot()
         self.final_cube = None
+        self.final_objective = None
+        self.neighborhood = NeighborhoodEvaluator.for_cube(self.magic_cube)
+        # Swaps weighed; a cache hit weighs none
+        self.evaluations = 0
 
-    def objective_function(self, cube_data):
-        original_data = self.magic_cube.data
-        self.magic_cube.data = cube_data
-        objective_value = self.magic_cube.objective_function()
-        self.magic_cube.data = original_data
-        return -objective_value
+    def scan(self):
+        """All best swaps of the current state, counting the swaps weighed."""
+        self.evaluations += NeighborhoodEvaluator.for_cube(self.magic_cube).n_pairs
+        return self.neighborhood.best_swaps(self.magic_cube)
 
     def find_best_neighbor(self):
-        indices = [(i, j, k) for i in range(self.magic_cube.size) for j in range(self.magic_cube.size) for k in range(self.magic_cube.size)]
-        best_neighbor = None
-        best_value = float('-inf')
-        current_data = copy.deepcopy(self.magic_cube.data)
-
-        for pos1, pos2 in itertools.combinations(indices, 2):
-            temp_data = copy.deepcopy(current_data)
-            x1, y1, z1 = pos1
-            x2, y2, z2 = pos2
-            temp_data[x1][y1][z1], temp_data[x2][y2][z2] = temp_data[x2][y2][z2], temp_data[x1][y1][z1]
-
-            neighbor_value = self.objective_function(temp_data)
-            if neighbor_value > best_value:
-                best_neighbor = (pos1, pos2)
-                best_value = neighbor_value
-
-        return best_neighbor, best_value
+        # Pick randomly among tied best swaps so plateaus are explored instead of cycled
+        if self.incremental:
+            best_neighbors, best_delta = self.scan()
+        else:
+            best_neighbors, best_delta = self.cache.lookup(self.magic_cube.state_hash, self.scan)
+        best_value = -(self.magic_cube.objective_function() + best_delta)
+        return random.choice(best_neighbors), best_value
 
     def run(self):
+        if self.incremental:
+            # Keep the swap deltas between iterations and rescore only the pairs a move touches
+            self.neighborhood = SwapDeltaTable(self.magic_cube)
         self.start_time = time.time()
-        current_value = self.objective_function(self.magic_cube.data)
-        self.objective_values.append(-current_value)
+        current_value = -self.magic_cube.objective_function()
+        self.objective_values.record(-current_value)
 
-        while True:
+        while -current_value > self.target_value:
             best_neighbor, best_value = self.find_best_neighbor()
             self.iterations += 1
 
             # Laporan tiap iterasi
             elapsed_time = time.time() - self.start_time
-            print(f"Iteration {self.iterations}: Objective = {-best_value}, Sideways Moves = {self.sideways_moves}, Time Elapsed = {elapsed_time:.4f} seconds")
+            if self.progress.due():
+                self.progress.emit('iteration', self.iterations, objective=-best_value,
+                                   sideways_moves=self.sideways_moves, time_elapsed=elapsed_time)
 
             if best_neighbor is None:
                 break
+            if self.time_limit is not None and elapsed_time >= self.time_limit:
+                break
 
             if best_value > current_value:
                 self.sideways_moves = 0
@@ -67,37 +76,59 @@ class HillClimbingWithSidewaysMove:
                 break
 
             pos1, pos2 = best_neighbor
-            self.magic_cube.swap(pos1, pos2)
+            self.neighborhood.apply_swap(self.magic_cube, pos1, pos2)
             current_value = best_value
-            self.objective_values.append(-best_value)
+            self.objective_values.record(-best_value)
 
         self.end_time = time.time()
-        self.final_cube = copy.deepcopy(self.magic_cube.data)
-    
-    def report(self):
+        self.final_cube = self.magic_cube.snapshot()
+        self.final_objective = self.magic_cube.objective_function()
+        self.objective_values.close()
+        self.progress.flush()
+
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        return {
+            'algorithm': 'hill_climbing_with_sideways_move',
+            'final_objective': self.final_objective,
+            'iterations': self.iterations,
+            'evaluations': self.evaluations,
+            'sideways_moves': self.sideways_moves,
+            'cache': self.cache.stats(),
+            'duration': self.end_time - self.start_time,
+            'final_state': list(self.final_cube),
+        }
+
+    def plot_spec(self):
+        """Describe the progress plot as plain data for reporting.render."""
+        steps, values = self.objective_values.series()
+        return {
+            'name': 'hill_climbing_with_sideways_move',
+            'figsize': [10, 6],
+            'panels': [{
+                'title': 'Objective Function Value over Iterations',
+                'xlabel': 'Iterations',
+                'ylabel': 'Objective Function Value',
+                'grid': True,
+                'legend': True,
+                'lines': [{'x': steps, 'y': values, 'label': 'Objective Function'}],
+            }],
+        }
+
+    def report(self, show=None):
         print("\nExperiment Report:")
         print(f"Initial State: ")
-        print((self.initial_cube))
+        print(self.magic_cube.to_nested(self.initial_cube))
         print(f"Final State: ")
-        print((self.final_cube))
-        print(f"Final Objective Value: {self.objective_values[-1]}")
+        print(self.magic_cube.to_nested(self.final_cube))
+        print(f"Final Objective Value: {self.objective_values.last}")
         print(f"Total Iterations: {self.iterations}")
         print(f"Total Sideways Moves: {self.sideways_moves}")
+        print(f"Scan Cache: {self.cache.hits} hits, {self.cache.misses} misses")
         print(f"Duration: {self.end_time - self.start_time:.4f} seconds")
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Plotting
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.objective_values, label='Objective Function')
-        plt.xlabel('Iterations')
-        plt.ylabel('Objective Function Value')
-        plt.title('Objective Function Value over Iterations')
-        plt.legend()
-        plt.grid(True)
 
         # Save the plot with a timestamp in the filename
-        plt.savefig(f'src/data/hill_climbing_with_sideways_move_plot_{timestamp}.png', format='png')
-        plt.show()
+        render_plot(self.plot_spec(), show=show)
         
 if __name__ == "__main__":
     cube = MagicCube(size=5)
@@ -0,0 +1,187 @@
+import random
+import time
+from array import array
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from algorithms.genetic_algorithm import GeneticAlgorithm
+from cube.cube import MagicCube
+from reporting.progress import SilentProgress, default_progress
+from reporting.render import render_plot
+
+def evolve_island(size, population, generations, first_iteration, mutation_rate, seed):
+    """Evolve one island's population for generations and return it with its fitness, best individual and history."""
+    random.seed(seed)
+    ga = GeneticAlgorithm(MagicCube(size), generations, len(population), mutation_rate, progress=SilentProgress())
+    ga.population = population
+    ga.start_time = time.time()
+    ga.evolve(generations, first_iteration)
+    # Score the evolved population once so the coordinator can pick migrants
+    fitness_values = ga.evaluate(ga.population)
+    return ga.population, fitness_values, ga.best_solution, ga.best_objective_value, ga.objective_values_history
+
+class IslandGeneticAlgorithm:
+    TOPOLOGIES = ('ring', 'full')
+
+    def __init__(self, magic_cube, amount_iteration, population_size, mutation_rate=0.01, islands=4,
+                 migration_interval=10, migration_size=2, topology='ring', workers=1, seed=None,
+                 progress=None):
+        if topology not in self.TOPOLOGIES:
+            raise ValueError(f"Unknown topology '{topology}'. Choose one of: {', '.join(self.TOPOLOGIES)}.")
+        self.magic_cube = magic_cube
+        self.amount_iteration = amount_iteration
+        self.population_size = population_size  # Per island
+        self.mutation_rate = mutation_rate
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.topology = topology
+        self.workers = workers
+        self.progress = default_progress(progress)
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.populations = []
+        self.island_best_solutions = [None] * islands
+        self.island_best_values = [float('inf')] * islands
+        self.island_histories = [[] for _ in range(islands)]
+        self.best_solution = None
+        self.best_objective_value = float('inf')
+        self.migrations = 0
+        self.start_time = None
+        self.end_time = None
+        self.initial_state = None
+        self.final_state = None
+
+    def destinations(self, island):
+        """Islands that receive migrants from the given island."""
+        if self.topology == 'ring':
+            return [(island + 1) % self.islands]
+        return [other for other in range(self.islands) if other != island]
+
+    def migrate(self, fitness_values):
+        """Copy each island's best individuals over the worst individuals of its destinations."""
+        incoming = [[] for _ in range(self.islands)]
+        for island, population in enumerate(self.populations):
+            ranked = np.argsort(fitness_values[island], kind='stable')
+            emigrants = population[ranked[:self.migration_size]].copy()
+            for destination in self.destinations(island):
+                incoming[destination].extend(emigrants)
+
+        for island, migrants in enumerate(incoming):
+            population = self.populations[island]
+            # Never let immigrants take over more than half of an island
+            migrants = migrants[:len(population) // 2]
+            ranked = np.argsort(-fitness_values[island], kind='stable')
+            for index, migrant in zip(ranked, migrants):
+                population[index] = migrant
+        self.migrations += 1
+
+    def record_final_populations(self, fitness_values):
+        """Fold the last epoch's evolved populations into the island and overall bests."""
+        for island, (population, fitness) in enumerate(zip(self.populations, fitness_values)):
+            best_index = int(np.argmin(fitness))
+            best_value = int(fitness[best_index])
+            if best_value < self.island_best_values[island]:
+                self.island_best_values[island] = best_value
+                self.island_best_solutions[island] = array('H', population[best_index].tolist())
+            if best_value < self.best_objective_value:
+                self.best_objective_value = best_value
+                self.best_solution = self.island_best_solutions[island]
+
+    def run(self):
+        """Evolve every island, migrating between them every migration_interval generations."""
+        self.start_time = time.time()
+        random.seed(self.seed)
+        self.initial_state = self.magic_cube.snapshot()
+        self.populations = [np.array([self.magic_cube.initialize_cube() for _ in range(self.population_size)],
+                                     dtype=np.int32) for _ in range(self.islands)]
+        size = self.magic_cube.size
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            generation = 0
+            epoch = 0
+            fitness_values = None
+            while generation < self.amount_iteration:
+                generations = min(self.migration_interval, self.amount_iteration - generation)
+                jobs = [(size, self.populations[island], generations, generation, self.mutation_rate,
+                         self.seed + (epoch + 1) * self.islands + island)
+                        for island in range(self.islands)]
+                if executor is None:
+                    results = [evolve_island(*job) for job in jobs]
+                else:
+                    results = list(executor.map(evolve_island, *zip(*jobs)))
+
+                fitness_values = []
+                for island, (population, fitness, best_solution, best_value, history) in enumerate(results):
+                    self.populations[island] = population
+                    fitness_values.append(fitness)
+                    self.island_histories[island].extend(history)
+                    if best_value < self.island_best_values[island]:
+                        self.island_best_values[island] = best_value
+                        self.island_best_solutions[island] = best_solution
+                    if best_value < self.best_objective_value:
+                        self.best_objective_value = best_value
+                        self.best_solution = best_solution
+
+                generation += generations
+                epoch += 1
+                if self.progress.due():
+                    self.progress.emit('generation', generation, best_objective=self.best_objective_value,
+                                       island_bests=list(self.island_best_values),
+                                       time=time.time() - self.start_time)
+
+                if generation < self.amount_iteration:
+                    self.migrate(fitness_values)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Earlier epochs' children are scored by the next epoch; the last epoch's only by evolve_island
+        if fitness_values is not None:
+            self.record_final_populations(fitness_values)
+
+        self.end_time = time.time()
+        self.final_state = self.best_solution
+        self.progress.flush()
+
+    def plot_spec(self):
+        """Describe every island's best objective plot as plain data for reporting.render."""
+        lines = []
+        for island, history in enumerate(self.island_histories):
+            iterations, best_values, _ = zip(*history)
+            lines.append({'x': list(iterations), 'y': list(best_values), 'label': f'Island {island + 1}'})
+        return {
+            'name': 'island_genetic_algorithm',
+            'panels': [{
+                'title': 'Island Genetic Algorithm Optimization of Magic Cube',
+                'xlabel': 'Iterations',
+                'ylabel': 'Best Objective Function Value',
+                'grid': True,
+                'legend': True,
+                'lines': lines,
+            }],
+        }
+
+    def report(self, show=None):
+        """Display the overall and per-island results and plot every island's best objective."""
+        duration = self.end_time - self.start_time
+        print("Initial State:")
+        print(self.magic_cube.to_nested(self.initial_state))
+        print("\nFinal State:")
+        print(self.magic_cube.to_nested(self.final_state))
+        print(f"\nFinal Objective Value: {self.best_objective_value}")
+        for island, best_value in enumerate(self.island_best_values):
+            print(f"Island {island + 1} Best Objective: {best_value}")
+        print(f"Islands: {self.islands} ({self.topology} topology)")
+        print(f"Population Size per Island: {self.population_size}")
+        print(f"Iterations: {self.amount_iteration}")
+        print(f"Migrations: {self.migrations}")
+        print(f"Duration: {duration:.2f} seconds")
+
+        render_plot(self.plot_spec(), show=show)
+
+if __name__ == "__main__":
+    magic_cube = MagicCube(size=5)
+    island_ga = IslandGeneticAlgorithm(magic_cube, amount_iteration=100, population_size=50, mutation_rate=0.01,
+                                       islands=4, migration_interval=10, migration_size=2, topology='ring', workers=4)
+    island_ga.run()
+    island_ga.report()
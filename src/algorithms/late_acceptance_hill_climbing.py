@@ -0,0 +1,150 @@
+import time
+from array import array
+from cube.cube import MagicCube
+from cube.moves import make_moves
+from reporting.progress import default_progress
+from reporting.render import render_plot
+from reporting.trajectory import make_recorder
+
+class LateAcceptanceHillClimbing:
+    """Hill climbing that compares a candidate with the objective of history_length steps ago.
+
+    A move is accepted when it does not worsen the current objective, or when the result is
+    no worse than the objective the search had history_length iterations earlier, read from a
+    fixed-length circular buffer. Every step is one swap score, one comparison and one buffer
+    write; there is no temperature to tune, only the history length, which should grow with
+    the evaluation budget (a longer history accepts more and converges later).
+    """
+
+    def __init__(self, magic_cube, history_length=200, max_evaluations=1000000, max_idle=None, time_limit=None,
+                 progress=None, trajectory=None, moves=None, target_value=0):
+        if history_length < 1:
+            raise ValueError("history_length must be at least 1.")
+        self.magic_cube = magic_cube
+        # Compared with the best objective before each move, since late acceptance may have left the best behind
+        self.target_value = target_value
+        self.history_length = history_length
+        self.max_evaluations = max_evaluations
+        # Stop after this many iterations in a row without a new best, None to run out the budget
+        self.max_idle = max_idle
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
+        # None for uniform swaps, a guided share for cube.moves.GuidedMoves, or a move generator
+        self.moves = make_moves(moves)
+        self.iterations = 0
+        self.accepted_worse = 0
+        self.start_time = None
+        self.end_time = None
+        # Bounded typed history; trajectory holds TrajectoryRecorder options
+        self.objective_values = make_recorder(trajectory, 'objective_values', 'q')
+        self.initial_cube = self.magic_cube.snapshot()
+        self.final_cube = None
+        self.best_objective = None
+
+    def run(self):
+        """Climb until the evaluation, idle or time budget runs out or the cube is solved."""
+        cube = self.magic_cube
+        self.start_time = time.time()
+        deadline = None if self.time_limit is None else self.start_time + self.time_limit
+        current_objective = cube.objective_function()
+        best_objective = current_objective
+        best_cube = cube.snapshot()
+        history = array('q', [current_objective]) * self.history_length
+        history_length = self.history_length
+        max_evaluations = self.max_evaluations
+        max_idle = self.max_idle
+        idle = 0
+        propose = self.moves.propose
+        progress = self.progress
+        record_objective = self.objective_values.record
+        record_objective(current_objective)
+
+        while best_objective > self.target_value:
+            if max_evaluations is not None and self.iterations >= max_evaluations:
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+
+            i, j = propose(cube)
+            delta = cube.swap_delta_at(i, j)
+            candidate = current_objective + delta
+            slot = self.iterations % history_length
+            # Accepting only from the score cached for this slot keeps every step constant cost
+            if delta <= 0 or candidate <= history[slot]:
+                cube.apply_swap_at(i, j)
+                if delta > 0:
+                    self.accepted_worse += 1
+                current_objective = candidate
+                if current_objective < best_objective:
+                    best_objective = current_objective
+                    cube.snapshot_into(best_cube)
+                    idle = 0
+            history[slot] = current_objective
+            self.iterations += 1
+            idle += 1
+            record_objective(current_objective)
+
+            if progress.due():
+                progress.emit('iteration', self.iterations, objective=current_objective, best_objective=best_objective)
+            if max_idle is not None and idle > max_idle:
+                break
+
+        self.final_cube = best_cube
+        self.best_objective = best_objective
+        self.end_time = time.time()
+        self.objective_values.close()
+        progress.flush()
+
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        return {
+            'algorithm': 'late_acceptance_hill_climbing',
+            'final_objective': self.best_objective,
+            'iterations': self.iterations,
+            # One swap is scored per iteration
+            'evaluations': self.iterations,
+            'history_length': self.history_length,
+            'accepted_worse': self.accepted_worse,
+            'guided_moves': getattr(self.moves, 'guided_moves', 0),
+            'duration': self.end_time - self.start_time,
+            'final_state': list(self.final_cube),
+        }
+
+    def plot_spec(self):
+        """Describe the progress plot as plain data for reporting.render."""
+        steps, values = self.objective_values.series()
+        return {
+            'name': 'late_acceptance_hill_climbing',
+            'figsize': [10, 6],
+            'panels': [{
+                'title': 'Objective Function Value over Iterations',
+                'xlabel': 'Iterations',
+                'ylabel': 'Objective Function Value',
+                'grid': True,
+                'legend': True,
+                'lines': [{'x': steps, 'y': values, 'label': 'Objective Function'}],
+            }],
+        }
+
+    def report(self, show=None):
+        """Display the results and plot the progress."""
+        print("=== Late Acceptance Hill Climbing Report ===")
+        print(f"Initial Objective Value: {self.objective_values.first}")
+        print(f"Best Objective Value: {self.best_objective}")
+        print(f"Total Iterations: {self.iterations}")
+        print(f"History Length: {self.history_length}")
+        print(f"Worsening Moves Accepted: {self.accepted_worse}")
+        print(f"Duration: {self.end_time - self.start_time:.4f} seconds")
+        print("\nInitial State:")
+        print(self.magic_cube.to_nested(self.initial_cube))
+        print("\nFinal State:")
+        print(self.magic_cube.to_nested(self.final_cube))
+
+        render_plot(self.plot_spec(), show=show)
+
+
+if __name__ == "__main__":
+    cube = MagicCube(size=5)
+    late_acceptance = LateAcceptanceHillClimbing(cube)
+    late_acceptance.run()
+    late_acceptance.report()
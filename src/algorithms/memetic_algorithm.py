@@ -0,0 +1,130 @@
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+from algorithms.genetic_algorithm import GeneticAlgorithm
+from cube.cube import MagicCube
+
+def refine_rows(size, population, steps, seeds):
+    """First-improvement swap search on every row of a population matrix, steps proposals each.
+
+    Returns the refined matrix and the number of improving swaps. Each row draws its moves
+    from its own seed, so a row refines the same way whichever chunk or process it lands in.
+    """
+    cube = MagicCube(size)
+    n_cells = size ** 3
+    refined = np.empty_like(population)
+    improvements = 0
+    for index, (row, seed) in enumerate(zip(population, seeds)):
+        randrange = random.Random(seed).randrange
+        cube.restore(array('H', row.tolist()))
+        for _ in range(steps):
+            i = randrange(n_cells)
+            j = randrange(n_cells - 1)
+            if j >= i:
+                j += 1
+            # Scored from the cached line sums; only improving swaps touch the cube
+            if cube.swap_delta_at(i, j) < 0:
+                cube.apply_swap_at(i, j)
+                improvements += 1
+        refined[index] = cube.cells
+    return refined, improvements
+
+class MemeticAlgorithm(GeneticAlgorithm):
+    """Genetic algorithm whose children are improved by a short local search before they compete.
+
+    Every individual of the initial population and every child gets refine_steps random swap
+    proposals, of which the improving ones are applied. Refined children then compete with
+    their parents, and the best distinct individuals of both form the next generation.
+    Crossover and mutation keep exploring between local optima while the refinement does
+    the fine-tuning they are poor at. With workers > 1 the refinement is split into one
+    chunk per worker process each generation; every row has its own seed, so the worker
+    count does not change the result.
+    """
+
+    name = 'memetic_algorithm'
+
+    def __init__(self, magic_cube, amount_iteration, population_size, mutation_rate=0.1, refine_steps=2000, workers=1,
+                 time_limit=None, progress=None, checkpoint=None, deduplicate=True, target_value=0):
+        super().__init__(magic_cube, amount_iteration, population_size, mutation_rate, time_limit=time_limit,
+                         progress=progress, checkpoint=checkpoint, deduplicate=deduplicate, target_value=target_value)
+        # Deduplication stays on by default here: next to the refinement the canonical hashes cost well
+        # under 1% of a generation, and they keep the plus selection from filling up with copies
+        self.refine_steps = refine_steps
+        self.workers = workers
+        self.executor = None
+        self.refinement_improvements = 0
+
+    def refine(self, population):
+        """Return the population with every row refined by refine_rows."""
+        if not self.refine_steps:
+            return population
+        size = self.magic_cube.size
+        seeds = self.rng.integers(2 ** 63, size=len(population))
+        chunks = np.array_split(population, self.workers)
+        seed_chunks = [chunk.tolist() for chunk in np.array_split(seeds, self.workers)]
+        run = map if self.executor is None else self.executor.map
+        results = list(run(refine_rows, repeat(size), chunks, repeat(self.refine_steps), seed_chunks))
+        refined = np.concatenate([chunk for chunk, _ in results])
+        improvements = sum(count for _, count in results)
+        self.refinement_improvements += improvements
+        self.evaluations += len(population) * self.refine_steps
+        return refined
+
+    def initialize_population(self):
+        super().initialize_population()
+        self.population = self.refine(self.population)
+
+    def evolve_population(self):
+        """Create children as the GA does, refine them, and keep the best of parents and children."""
+        parents, parent_fitness = self.population, self.fitness
+        super().evolve_population()
+        children = self.refine(self.population)
+        # Plus selection: refined individuals took work to reach, so a child only replaces a worse parent
+        merged = np.concatenate((parents, children))
+        merged_fitness = np.concatenate((parent_fitness, self.evaluate(children)))
+        self.evaluations += len(children)
+        ranked = np.argsort(merged_fitness, kind='stable')
+        if self.symmetry is not None:
+            # A child refined back onto a parent's optimum (or an equivalent of it) would crowd out the others
+            _, first = np.unique(self.symmetry.canonical_hashes(merged[ranked]), return_index=True)
+            distinct = ranked[np.sort(first)]
+            ranked = np.concatenate((distinct, np.setdiff1d(ranked, distinct, assume_unique=True)))
+        survivors = ranked[:self.population_size]
+        self.population = merged[survivors]
+        # Every survivor was scored above, so the next generation starts from these scores
+        self.fitness = merged_fitness[survivors]
+
+    def run(self, resume=False):
+        """Run the memetic algorithm; the worker pool lives for the whole run."""
+        self.executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            super().run(resume)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        summary = super().result()
+        summary['refine_steps'] = self.refine_steps
+        summary['refinement_improvements'] = self.refinement_improvements
+        return summary
+
+    def plot_spec(self):
+        spec = super().plot_spec()
+        spec['panels'][0]['title'] = 'Memetic Algorithm Optimization of Magic Cube'
+        return spec
+
+    def report(self, show=None):
+        """Display the GA report preceded by the refinement statistics."""
+        print(f"Refinement Steps per Child: {self.refine_steps}")
+        print(f"Improving Refinement Swaps: {self.refinement_improvements}")
+        super().report(show)
+
+if __name__ == "__main__":
+    memetic = MemeticAlgorithm(MagicCube(size=5), amount_iteration=100, population_size=10)
+    memetic.run()
+    memetic.report()
@@ -0,0 +1,185 @@
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from cube.cube import MagicCube
+from cube.moves import make_moves
+from reporting.progress import default_progress
+from reporting.render import render_plot
+
+def anneal_segment(size, cells, temperature, steps, seed, moves=None):
+    """Run steps Metropolis swaps at one temperature from cells; return end and best states, objectives, accepts."""
+    random.seed(seed)
+    propose = make_moves(moves).propose
+    cube = MagicCube(size)
+    cube.restore(cells)
+    current_objective = cube.objective_function()
+    best_objective = current_objective
+    best_cells = cube.snapshot()
+    accepted = 0
+
+    for _ in range(steps):
+        i, j = propose(cube)
+        delta_e = cube.swap_delta_at(i, j)
+        if delta_e <= 0 or random.random() < math.exp(-delta_e / temperature):
+            cube.apply_swap_at(i, j)
+            current_objective += delta_e
+            accepted += 1
+            if current_objective < best_objective:
+                best_objective = current_objective
+                cube.snapshot_into(best_cells)
+                if best_objective == 0:
+                    break
+
+    return cube.snapshot(), current_objective, best_cells, best_objective, accepted
+
+class ParallelTempering:
+    """Replica-exchange simulated annealing: K replicas at a ladder of fixed temperatures."""
+
+    def __init__(self, magic_cube, replicas=8, min_temp=1.0, max_temp=100.0,
+                 exchange_interval=1000, rounds=100, workers=1, seed=None, progress=None, moves=None):
+        self.magic_cube = magic_cube
+        # None for uniform swaps or a guided share for cube.moves.GuidedMoves; sent to every segment
+        self.moves = moves
+        self.replicas = replicas
+        self.exchange_interval = exchange_interval
+        self.rounds = rounds
+        self.workers = workers
+        self.progress = default_progress(progress)
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        # Geometric temperature ladder from the coldest to the hottest replica
+        if replicas > 1:
+            ratio = (max_temp / min_temp) ** (1 / (replicas - 1))
+            self.temperatures = [min_temp * ratio ** k for k in range(replicas)]
+        else:
+            self.temperatures = [min_temp]
+        self.iterations = 0
+        self.start_time = None
+        self.end_time = None
+        self.best_objective_values = []
+        self.replica_objective_values = [[] for _ in range(replicas)]
+        self.exchange_attempts = [0] * max(replicas - 1, 0)
+        self.exchange_accepts = [0] * max(replicas - 1, 0)
+        self.initial_cube = self.magic_cube.snapshot()
+        self.final_cube = None
+        self.best_objective = None
+
+    def exchange(self, states, objectives, round_index):
+        """Try to swap states between neighbouring temperatures, alternating even and odd pairs."""
+        for k in range(round_index % 2, self.replicas - 1, 2):
+            self.exchange_attempts[k] += 1
+            beta_gap = 1 / self.temperatures[k] - 1 / self.temperatures[k + 1]
+            exponent = beta_gap * (objectives[k] - objectives[k + 1])
+            if exponent >= 0 or self.rng.random() < math.exp(exponent):
+                states[k], states[k + 1] = states[k + 1], states[k]
+                objectives[k], objectives[k + 1] = objectives[k + 1], objectives[k]
+                self.exchange_accepts[k] += 1
+
+    def run(self):
+        self.start_time = datetime.now()
+        random.seed(self.seed)
+        # Exchanges draw from their own stream; in serial mode the segments reseed the global one
+        self.rng = random.Random(self.seed)
+        size = self.magic_cube.size
+
+        # Every replica starts from its own random state
+        states = [self.magic_cube.snapshot()]
+        states += [self.magic_cube.initialize_cube() for _ in range(self.replicas - 1)]
+        objectives = []
+        for state in states:
+            self.magic_cube.restore(state)
+            objectives.append(self.magic_cube.objective_function())
+        best_objective = min(objectives)
+        best_cube = states[objectives.index(best_objective)]
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for round_index in range(self.rounds):
+                seeds = [self.seed + (round_index + 1) * self.replicas + k for k in range(self.replicas)]
+                jobs = [(size, states[k], self.temperatures[k], self.exchange_interval, seeds[k], self.moves)
+                        for k in range(self.replicas)]
+                if executor is None:
+                    results = [anneal_segment(*job) for job in jobs]
+                else:
+                    results = list(executor.map(anneal_segment, *zip(*jobs)))
+
+                for k, (state, objective, replica_best_cells, replica_best, _) in enumerate(results):
+                    states[k] = state
+                    objectives[k] = objective
+                    self.replica_objective_values[k].append(objective)
+                    if replica_best < best_objective:
+                        best_objective = replica_best
+                        best_cube = replica_best_cells
+
+                self.iterations += self.replicas * self.exchange_interval
+                self.best_objective_values.append(best_objective)
+                if self.progress.due():
+                    self.progress.emit('round', round_index + 1, best_objective=best_objective,
+                                       coldest_replica=objectives[0], hottest_replica=objectives[-1])
+
+                if best_objective == 0:
+                    break
+                self.exchange(states, objectives, round_index)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.best_objective = best_objective
+        self.final_cube = best_cube
+        self.magic_cube.restore(best_cube)
+        self.end_time = datetime.now()
+        self.progress.flush()
+
+    def plot_spec(self):
+        """Describe the best and per-replica objective plots as plain data for reporting.render."""
+        rounds = list(range(len(self.best_objective_values)))
+        return {
+            'name': 'parallel_tempering',
+            'figsize': [12, 5],
+            'panels': [
+                # Best objective found so far after each exchange round
+                {
+                    'title': "Best Objective vs. Rounds",
+                    'xlabel': "Rounds",
+                    'ylabel': "Objective Function Value",
+                    'legend': True,
+                    'lines': [{'x': rounds, 'y': list(self.best_objective_values), 'label': 'Best Objective Value'}],
+                },
+                # Objective held by each temperature slot at the end of every round
+                {
+                    'title': "Replica Objectives vs. Rounds",
+                    'xlabel': "Rounds",
+                    'ylabel': "Objective Function Value",
+                    'legend': True,
+                    'lines': [{'x': rounds, 'y': list(objective_values), 'label': f'T = {self.temperatures[k]:.2f}'}
+                              for k, objective_values in enumerate(self.replica_objective_values)],
+                },
+            ],
+        }
+
+    def report(self, show=None):
+        duration = (self.end_time - self.start_time).total_seconds()
+
+        print("=== Parallel Tempering Report ===")
+        print(f"Final Objective Value: {self.best_objective}")
+        print(f"Replicas: {self.replicas}")
+        print(f"Temperatures: {', '.join(f'{temp:.4f}' for temp in self.temperatures)}")
+        print(f"Total Iterations: {self.iterations}")
+        print(f"Execution Time: {duration:.4f} seconds")
+        for k in range(self.replicas - 1):
+            rate = self.exchange_accepts[k] / self.exchange_attempts[k] if self.exchange_attempts[k] else 0.0
+            print(f"Exchange Rate T{k}<->T{k + 1}: {rate:.4f}")
+        print("\nInitial State:")
+        print(self.magic_cube.to_nested(self.initial_cube))
+        print("\nFinal State:")
+        print(self.magic_cube.to_nested(self.final_cube))
+
+        render_plot(self.plot_spec(), show=show)
+
+
+if __name__ == "__main__":
+    magic_cube = MagicCube(5)
+    pt = ParallelTempering(magic_cube, replicas=8, min_temp=1.0, max_temp=100.0,
+                           exchange_interval=1000, rounds=100, workers=8)
+    pt.run()
+    pt.report()
@@ -1,108 +1,252 @@
-import copy
-import datetime
+import multiprocessing
+import random
 import time
-from matplotlib import pyplot as plt
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from algorithms.steepest_ascent_hill_climbing import SteepestAscentHillClimbing
 from cube.cube import MagicCube
+from cube.symmetry import SymmetryTable
+from reporting.progress import SilentProgress, default_progress
+from reporting.render import render_plot
+
+def run_restart(restart, size, seed, stop_event=None, deadline=None, trajectory=None, target_value=0):
+    """Climb from a cube shuffled with seed; return the restart's states and timings, or None past the deadline."""
+    time_limit = None
+    if deadline is not None:
+        time_limit = deadline - time.time()
+        # Restarts that would start after the time budget ran out are skipped
+        if time_limit <= 0:
+            return None
+
+    random.seed(seed)
+    cube = MagicCube(size)
+    initial_state = cube.snapshot()
+    # Progress is reported per restart by the coordinator, never from inside a climb
+    hill_climber = SteepestAscentHillClimbing(cube, incremental=True, stop_event=stop_event, time_limit=time_limit,
+                                              progress=SilentProgress(), trajectory=trajectory,
+                                              target_value=target_value)
+
+    restart_start_time = time.time()
+    hill_climber.run()
+    restart_end_time = time.time()
+
+    return {
+        'restart': restart,
+        'seed': seed,
+        'initial_state': initial_state,
+        'final_state': cube.snapshot(),
+        'final_value': cube.objective_function(),
+        'objective_values': hill_climber.objective_values,
+        'iterations': hill_climber.iterations,
+        'evaluations': hill_climber.evaluations,
+        'duration': restart_end_time - restart_start_time,
+        'stopped': hill_climber.stopped,
+    }
 
 class RandomRestartHillClimbing:
-    def __init__(self, magic_cube, max_restarts=5):
+    def __init__(self, magic_cube, max_restarts=5, workers=1, seed=None, target_value=0, time_limit=None,
+                 progress=None, trajectory=None, checkpoint=None, deduplicate=True):
         self.magic_cube = magic_cube
         self.max_restarts = max_restarts
+        self.workers = workers
+        self.target_value = target_value
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
+        self.checkpoint = checkpoint
+        # Each restart keeps a bounded history; spilling is per series, so it is not used here
+        self.trajectory = dict(trajectory or {}, spill=None)
+        # Restart i always runs with seed + i, so a run can be reproduced in serial or parallel
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        # Climbs often end in the same local optimum, or a rotation, reflection or complement of it
+        self.symmetry = SymmetryTable.for_size(magic_cube.size) if deduplicate else None
+        self.distinct_optima = None
+        self.duplicate_of = []
         self.best_cube_state = None
         self.best_objective_value = float('inf')
+        self.restart_numbers = []
         self.all_objective_values_by_restart = []  
         self.final_objective_values = []  
         self.initial_cube_states = []  
         self.final_cube_states = []  
         self.restart_durations = []  
         self.iterations_per_restart = []  
+        self.evaluations_per_restart = []
+
+    def iter_results(self, completed=(), elapsed=0.0):
+        """Run the restarts not in completed and yield each restart's result as soon as it finishes."""
+        size = self.magic_cube.size
+        deadline = None if self.time_limit is None else time.time() + self.time_limit - elapsed
+        restarts = [restart for restart in range(self.max_restarts) if restart not in completed]
+
+        if self.workers <= 1:
+            for restart in restarts:
+                # A climb that reaches the target stops there, and so do the restarts after it
+                result = run_restart(restart, size, self.seed + restart, deadline=deadline,
+                                     trajectory=self.trajectory, target_value=self.target_value)
+                if result is None:
+                    return
+                yield result
+                if result['final_value'] <= self.target_value:
+                    return
+            return
+
+        # A manager event reaches the workers so running climbs can stop early too
+        with multiprocessing.Manager() as manager:
+            stop_event = manager.Event()
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+            try:
+                futures = [executor.submit(run_restart, restart, size, self.seed + restart, stop_event, deadline,
+                                           self.trajectory, self.target_value)
+                           for restart in restarts]
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    result = future.result()
+                    # Climbs interrupted by the cancellation never reached a local optimum
+                    if result is None or result['stopped']:
+                        continue
+                    yield result
+                    if result['final_value'] <= self.target_value and not stop_event.is_set():
+                        stop_event.set()
+                        for pending in futures:
+                            pending.cancel()
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def save_checkpoint(self, results, elapsed):
+        """Write the finished restarts; each restart's own seed makes the rest reproducible."""
+        self.checkpoint.save({
+            'algorithm': 'random_restart_hill_climbing',
+            'seed': self.seed,
+            'results': results,
+            'elapsed': elapsed,
+        })
+
+    def run(self, resume=False):
+        """Run the restarts; resume=True skips the restarts already finished in the checkpoint."""
+        state = self.checkpoint.load('random_restart_hill_climbing') if resume and self.checkpoint is not None else None
+        results = [] if state is None else state['results']
+        elapsed = 0.0 if state is None else state['elapsed']
+        if state is not None:
+            self.seed = state['seed']
+        # Durations and the time limit cover the time spent before the checkpoint too
+        overall_start_time = time.time() - elapsed
+
+        for result in results:
+            if result['final_value'] < self.best_objective_value:
+                self.best_objective_value = result['final_value']
+                self.best_cube_state = result['final_state']
+
+        # A restored run that already reached the target has nothing left to do
+        completed = {result['restart'] for result in results}
+        pending = self.iter_results(completed, elapsed) if self.best_objective_value > self.target_value else ()
+        for result in pending:
+            results.append(result)
+            if self.checkpoint is not None and self.checkpoint.due():
+                self.save_checkpoint(results, time.time() - overall_start_time)
+            # Restarts are few and slow, so every one is reported
+            self.progress.emit('restart', result['restart'] + 1, objective=result['final_value'],
+                               iterations=result['iterations'], duration=result['duration'])
 
-    def run(self):
-        overall_start_time = time.time()
-
-        for restart in range(self.max_restarts):
-            print(f"\nRestart {restart + 1}/{self.max_restarts}...")
-            
-            # Randomize initial state for each restart
-            self.magic_cube.data = self.magic_cube.initialize_cube()
-            self.initial_cube_states.append(copy.deepcopy(self.magic_cube.data))  
-            
-            # Copy randomized cube state for the steepest ascent hill climbing algorithm
-            cube_copy = copy.deepcopy(self.magic_cube)
-            hill_climber = SteepestAscentHillClimbing(cube_copy)
-
-            # Track time and iterations for this restart
-            restart_start_time = time.time()
-            hill_climber.run()
-            restart_end_time = time.time()
-            self.restart_durations.append(restart_end_time - restart_start_time)
-            self.iterations_per_restart.append(hill_climber.iterations)  
-            
-            # Append the objective values of this restart
-            self.all_objective_values_by_restart.append(hill_climber.objective_values)
-            
-            # Store the final state and objective value of this restart
-            final_value = hill_climber.objective_values[-1]
-            self.final_objective_values.append(final_value)
-            self.final_cube_states.append(copy.deepcopy(hill_climber.magic_cube.data))
-            
             # Check if this restart found a better solution
-            if final_value < self.best_objective_value:
-                self.best_objective_value = final_value
-                self.best_cube_state = copy.deepcopy(hill_climber.magic_cube.data)
+            if result['final_value'] < self.best_objective_value:
+                self.best_objective_value = result['final_value']
+                self.best_cube_state = result['final_state']
+
+        # Keep the per-restart records in restart order regardless of completion order
+        first_restart_by_optimum = {}
+        for result in sorted(results, key=lambda result: result['restart']):
+            if self.symmetry is not None:
+                # Hashed once per climb, so equivalent optima are told apart from new ones at no real cost
+                optimum = self.symmetry.canonical_hash(result['final_state'])
+                self.duplicate_of.append(first_restart_by_optimum.get(optimum))
+                first_restart_by_optimum.setdefault(optimum, result['restart'] + 1)
+            self.restart_numbers.append(result['restart'] + 1)
+            self.initial_cube_states.append(result['initial_state'])
+            self.final_cube_states.append(result['final_state'])
+            self.final_objective_values.append(result['final_value'])
+            self.all_objective_values_by_restart.append(result['objective_values'])
+            self.iterations_per_restart.append(result['iterations'])
+            # Checkpoints written before evaluations were counted lack the field
+            self.evaluations_per_restart.append(result.get('evaluations', 0))
+            self.restart_durations.append(result['duration'])
+        if self.symmetry is not None:
+            self.distinct_optima = len(first_restart_by_optimum)
 
         overall_end_time = time.time()
         self.total_duration = overall_end_time - overall_start_time
+        self.progress.flush()
 
-    def report(self):
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        return {
+            'algorithm': 'random_restart_hill_climbing',
+            'final_objective': self.best_objective_value,
+            'iterations': sum(self.iterations_per_restart),
+            'evaluations': sum(self.evaluations_per_restart),
+            'restarts': len(self.restart_numbers),
+            'distinct_optima': self.distinct_optima,
+            'duplicate_optima': sum(restart is not None for restart in self.duplicate_of),
+            'final_objectives': self.final_objective_values,
+            'duration': self.total_duration,
+            'final_state': None if self.best_cube_state is None else list(self.best_cube_state),
+        }
+
+    def plot_spec(self):
+        """Describe the combined restart plots as plain data for reporting.render."""
+        restart_lines = []
+        for restart_number, objective_values in zip(self.restart_numbers, self.all_objective_values_by_restart):
+            steps, values = objective_values.series()
+            restart_lines.append({'x': steps, 'y': values, 'label': f'Restart {restart_number}'})
+        return {
+            'name': 'random_restart_hill_climbing_combined',
+            'figsize': [12, 6],
+            'panels': [
+                # Iterations vs. Objective Function Value for each restart
+                {
+                    'title': 'Objective Function Value over Iterations (Random Restarts)',
+                    'xlabel': 'Iterations',
+                    'ylabel': 'Objective Function Value',
+                    'grid': True,
+                    'legend': True,
+                    'legend_title': 'Restart',
+                    'lines': restart_lines,
+                },
+                # Final Objective Function Value per Restart
+                {
+                    'title': 'Final Objective Function Value per Restart',
+                    'xlabel': 'Restart Number',
+                    'ylabel': 'Final Objective Function Value',
+                    'grid': True,
+                    'lines': [{'x': list(self.restart_numbers), 'y': list(self.final_objective_values),
+                               'fmt': 'o-', 'color': 'red'}],
+                },
+            ],
+        }
+
+    def report(self, show=None):
         """Generate a report with detailed information and plots."""
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        
         print("\nExperiment Report:")
         total_iterations = sum(self.iterations_per_restart)
-        for i in range(self.max_restarts):
-            print(f"\nRestart {i + 1}/{self.max_restarts}:")
-            print(f"Initial State: {self.initial_cube_states[i]}")
-            print(f"Final State: {self.final_cube_states[i]}")
+        for i in range(len(self.restart_numbers)):
+            print(f"\nRestart {self.restart_numbers[i]}/{self.max_restarts}:")
+            print(f"Initial State: {self.magic_cube.to_nested(self.initial_cube_states[i])}")
+            print(f"Final State: {self.magic_cube.to_nested(self.final_cube_states[i])}")
             print(f"Final Objective Value: {self.final_objective_values[i]}")
             print(f"Iterations: {self.iterations_per_restart[i]}")
             print(f"Duration: {self.restart_durations[i]:.4f} seconds")
+            if self.duplicate_of and self.duplicate_of[i] is not None:
+                print(f"Local optimum equivalent to Restart {self.duplicate_of[i]}'s")
 
         print("\nBest Overall Solution:")
         print(f"Final Objective Value: {self.best_objective_value}")
-        print(f"Best Final Cube State: {self.best_cube_state}")
+        print(f"Best Final Cube State: {self.magic_cube.to_nested(self.best_cube_state)}")
         print(f"Total Iterations Across All Restarts: {total_iterations}")
+        if self.symmetry is not None:
+            print(f"Distinct Local Optima (up to symmetry): {self.distinct_optima}")
         print(f"Total Duration (all restarts): {self.total_duration:.4f} seconds")
 
-        # Plot 1: Objective Function Value over Iterations (with Random Restarts)
-        plt.figure(figsize=(12, 6))
-        
-        # Subplot 1: Iterations vs. Objective Function Value for each restart
-        plt.subplot(1, 2, 1)
-        for restart_index, objective_values in enumerate(self.all_objective_values_by_restart):
-            plt.plot(objective_values, label=f'Restart {restart_index + 1}')
-        
-        plt.xlabel('Iterations')
-        plt.ylabel('Objective Function Value')
-        plt.title('Objective Function Value over Iterations (Random Restarts)')
-        plt.legend(title='Restart')
-        plt.grid(True)
-
-        # Subplot 2: Final Objective Function Value per Restart
-        plt.subplot(1, 2, 2)
-        plt.plot(range(1, self.max_restarts + 1), self.final_objective_values, 'o-', color='red')
-        plt.xlabel('Restart Number')
-        plt.ylabel('Final Objective Function Value')
-        plt.title('Final Objective Function Value per Restart')
-        plt.grid(True)
-
-        # Adjust layout to prevent overlap
-        plt.tight_layout()
-
         # Save the combined plot with a timestamp in the filename
-        plt.savefig(f'src/data/random_restart_hill_climbing_combined_plot_{timestamp}.png', format='png')
-        plt.show()
+        render_plot(self.plot_spec(), show=show)
 
 if __name__ == "__main__":
     cube = MagicCube(size=5)
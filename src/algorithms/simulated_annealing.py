@@ -1,56 +1,115 @@
 import random
 import math
-import copy
-import matplotlib.pyplot as plt
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+from algorithms.cooling import BUDGET_FINAL_TEMP, make_schedule
 from cube.cube import MagicCube
+from cube.moves import make_moves
+from reporting.progress import default_progress
+from reporting.render import render_plot
+from reporting.trajectory import make_recorder
 
 class SimulatedAnnealing:
-    def __init__(self, magic_cube, initial_temp, cooling_rate):
+    def __init__(self, magic_cube, initial_temp, cooling_rate=0.95, time_limit=None, progress=None, trajectory=None,
+                 checkpoint=None, schedule=None, final_temp=None, budget_seconds=None, max_evaluations=None,
+                 moves=None, target_value=0):
         self.magic_cube = magic_cube
+        # Compared with the best objective after every move, accepted or not; the chain itself may sit above it
+        self.target_value = target_value
         self.initial_temp = initial_temp
         self.cooling_rate = cooling_rate
+        # A schedule name from algorithms.cooling.SCHEDULES or a CoolingSchedule; cooling_rate drives 'geometric'
+        self.schedule = make_schedule(schedule, cooling_rate)
+        if self.schedule.needs_budget and budget_seconds is None and max_evaluations is None:
+            raise ValueError(f"The '{self.schedule.name}' schedule never reaches final_temp on its own; "
+                             "give budget_seconds or max_evaluations.")
+        # With a budget the schedule is stretched to reach final_temp exactly when the budget runs out
+        if final_temp is None:
+            budgeted = budget_seconds is not None or max_evaluations is not None
+            final_temp = BUDGET_FINAL_TEMP if budgeted else 1e-10
+        self.final_temp = final_temp
+        self.budget_seconds = budget_seconds
+        self.max_evaluations = max_evaluations
+        # None for uniform swaps, a guided share for cube.moves.GuidedMoves, or a move generator
+        self.moves = make_moves(moves)
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
+        self.checkpoint = checkpoint
         self.iterations = 0
         self.start_time = None
         self.end_time = None
-        self.objective_values = []
-        self.acceptance_probabilities = []  
+        # Bounded typed histories; trajectory holds TrajectoryRecorder options
+        self.objective_values = make_recorder(trajectory, 'objective_values', 'q')
+        self.acceptance_probabilities = make_recorder(trajectory, 'acceptance_probabilities', 'd')
         self.local_optima_stuck_count = 0 
-        self.initial_cube = copy.deepcopy(self.magic_cube.data)
+        self.initial_cube = self.magic_cube.snapshot()
         self.final_cube = None
+        self.best_objective = None
 
     def find_neighbor(self):
-        pos1 = (random.randint(0, self.magic_cube.size - 1),
-                random.randint(0, self.magic_cube.size - 1),
-                random.randint(0, self.magic_cube.size - 1))
-        
-        pos2 = (random.randint(0, self.magic_cube.size - 1),
-                random.randint(0, self.magic_cube.size - 1),
-                random.randint(0, self.magic_cube.size - 1))
-        
-        # Ensure pos1 and pos2 are different
-        while pos1 == pos2:
-            pos2 = (random.randint(0, self.magic_cube.size - 1),
-                    random.randint(0, self.magic_cube.size - 1),
-                    random.randint(0, self.magic_cube.size - 1))
-        
-        neighbor_cube = copy.deepcopy(self.magic_cube)
-        neighbor_cube.swap(pos1, pos2)
-
-        return neighbor_cube
-
-    def run(self):
-        current_temp = self.initial_temp
-        current_objective = self.magic_cube.objective_function()
-        best_objective = current_objective
-        best_cube = copy.deepcopy(self.magic_cube.data)
-        self.start_time = datetime.now()
+        """Propose a move as a pair of distinct flat cell offsets; the cube is not touched."""
+        return self.moves.propose(self.magic_cube)
+
+    def save_checkpoint(self, current_temp, best_objective, best_cube):
+        """Write everything the next iteration depends on, including the random stream."""
+        self.checkpoint.save({
+            'algorithm': 'simulated_annealing',
+            'cells': self.magic_cube.snapshot(),
+            'temperature': current_temp,
+            'best_objective': best_objective,
+            'best_cube': best_cube,
+            'initial_cube': self.initial_cube,
+            'schedule': self.schedule,
+            'moves': self.moves,
+            'iterations': self.iterations,
+            'local_optima_stuck_count': self.local_optima_stuck_count,
+            'objective_values': self.objective_values,
+            'acceptance_probabilities': self.acceptance_probabilities,
+            'elapsed': (datetime.now() - self.start_time).total_seconds(),
+            'random_state': random.getstate(),
+        })
+
+    def run(self, resume=False):
+        """Anneal until the temperature or time budget runs out; resume=True continues from the checkpoint."""
+        cube = self.magic_cube
+        state = self.checkpoint.load('simulated_annealing') if resume and self.checkpoint is not None else None
+        if state is None:
+            current_temp = self.initial_temp
+            self.schedule.start(self.initial_temp, self.final_temp)
+            best_objective = cube.objective_function()
+            # Preallocated once; improvements are copied into it instead of allocating snapshots
+            best_cube = cube.snapshot()
+            elapsed = 0.0
+        else:
+            cube.restore(state['cells'])
+            current_temp = state['temperature']
+            best_objective = state['best_objective']
+            best_cube = state['best_cube']
+            self.initial_cube = state['initial_cube']
+            self.schedule = state['schedule']
+            self.moves = state['moves']
+            self.iterations = state['iterations']
+            self.local_optima_stuck_count = state['local_optima_stuck_count']
+            self.objective_values = state['objective_values']
+            self.acceptance_probabilities = state['acceptance_probabilities']
+            elapsed = state['elapsed']
+            random.setstate(state['random_state'])
+        current_objective = cube.objective_function()
+        # Durations and the time limit cover the time spent before the checkpoint too
+        self.start_time = datetime.now() - timedelta(seconds=elapsed)
+        deadline = None if self.time_limit is None else time.time() + self.time_limit - elapsed
+        budget_start = time.time() - elapsed
+        budgeted = self.budget_seconds is not None or self.max_evaluations is not None
+        schedule = self.schedule
+        checkpoint = self.checkpoint
+        progress = self.progress
+        record_objective = self.objective_values.record
+        record_acceptance = self.acceptance_probabilities.record
 
         while True:
-            # Find neighbor
-            neighbor_cube = self.find_neighbor()
-            new_objective = neighbor_cube.objective_function()
-            delta_e = new_objective - current_objective
+            # Find neighbor and score it without applying it
+            i, j = self.find_neighbor()
+            delta_e = cube.swap_delta_at(i, j)
 
             # Compute acceptance probability
             if delta_e < 0:
@@ -59,74 +118,122 @@ class SimulatedAnnealing:
                 acceptance_prob = math.exp(-delta_e / current_temp)
             
             # Accept the neighbor based on the probability
-            if delta_e < 0 or random.uniform(0, 1) < acceptance_prob:
-                self.magic_cube = neighbor_cube
-                current_objective = new_objective
+            # Only an accepted move is applied, so a rejection costs nothing to undo
+            accepted = delta_e < 0 or random.random() < acceptance_prob
+            improved = False
+            if accepted:
+                cube.apply_swap_at(i, j)
+                current_objective += delta_e
 
                 if current_objective < best_objective:
                     best_objective = current_objective
-                    best_cube = copy.deepcopy(self.magic_cube.data)
+                    cube.snapshot_into(best_cube)
+                    improved = True
             else:
                 # Increment the counter if we are "stuck" in a local optimum
                 self.local_optima_stuck_count += 1
             
             # Store values
-            self.objective_values.append(current_objective)
-            self.acceptance_probabilities.append(acceptance_prob)
+            record_objective(current_objective)
+            record_acceptance(acceptance_prob)
             self.iterations += 1
 
-            print(f"Iteration {self.iterations}: Temp = {current_temp:.4f}, Objective = {current_objective}, Acceptance Probability = {acceptance_prob:.4f}")
+            if progress.due():
+                progress.emit('iteration', self.iterations, temp=current_temp, objective=current_objective,
+                              acceptance_probability=acceptance_prob)
 
             # Update temperature
-            current_temp *= self.cooling_rate
+            if budgeted:
+                fraction = 0.0
+                if self.budget_seconds is not None:
+                    fraction = (time.time() - budget_start) / self.budget_seconds
+                if self.max_evaluations is not None:
+                    fraction = max(fraction, self.iterations / self.max_evaluations)
+                if fraction >= 1.0:
+                    break
+                current_temp = schedule.next_temperature(current_temp, accepted, improved, fraction)
+            else:
+                current_temp = schedule.next_temperature(current_temp, accepted, improved)
+                if schedule.finished(current_temp):
+                    break
 
             # Termination condition
-            if current_temp < 1e-10 or best_objective == 0:
+            if best_objective <= self.target_value:
                 break
+            if deadline is not None and time.time() >= deadline:
+                break
+
+            if checkpoint is not None and checkpoint.due():
+                self.save_checkpoint(current_temp, best_objective, best_cube)
 
         # Final state
         self.final_cube = best_cube
+        self.best_objective = best_objective
         self.end_time = datetime.now()
+        self.objective_values.close()
+        self.acceptance_probabilities.close()
+        progress.flush()
+
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        return {
+            'algorithm': 'simulated_annealing',
+            'final_objective': self.best_objective,
+            'iterations': self.iterations,
+            # One swap is scored per iteration
+            'evaluations': self.iterations,
+            'schedule': self.schedule.name,
+            'guided_moves': getattr(self.moves, 'guided_moves', 0),
+            'local_optima_stuck_count': self.local_optima_stuck_count,
+            'duration': (self.end_time - self.start_time).total_seconds(),
+            'final_state': list(self.final_cube),
+        }
         
-    def report(self):
+    def plot_spec(self):
+        """Describe the objective and acceptance probability plots as plain data for reporting.render."""
+        objective_steps, objective_values = self.objective_values.series()
+        acceptance_steps, acceptance_values = self.acceptance_probabilities.series()
+        return {
+            'name': 'simulated_annealing',
+            'figsize': [12, 5],
+            'panels': [
+                # Objective function values over iterations
+                {
+                    'title': "Objective Function vs. Iterations",
+                    'xlabel': "Iterations",
+                    'ylabel': "Objective Function Value",
+                    'legend': True,
+                    'lines': [{'x': objective_steps, 'y': objective_values, 'label': 'Objective Value'}],
+                },
+                # Acceptance probabilities over iterations
+                {
+                    'title': "Acceptance Probability vs. Iterations",
+                    'xlabel': "Iterations",
+                    'ylabel': "Acceptance Probability",
+                    'legend': True,
+                    'lines': [{'x': acceptance_steps, 'y': acceptance_values, 'label': 'Acceptance Probability'}],
+                },
+            ],
+        }
+
+    def report(self, show=None):
         # Execution time
         duration = (self.end_time - self.start_time).total_seconds()
 
         print("=== Simulated Annealing Report ===")
-        print(f"Initial Objective Value: {self.objective_values[0]}")
-        print(f"Final Objective Value: {self.objective_values[-1]}")
+        print(f"Initial Objective Value: {self.objective_values.first}")
+        print(f"Final Objective Value: {self.objective_values.last}")
         print(f"Total Iterations: {self.iterations}")
+        print(f"Cooling Schedule: {self.schedule.name}")
         print(f"Execution Time: {duration:.4f} seconds")
         print(f"Frequency of getting stuck in local optima: {self.local_optima_stuck_count}")
         print("\nInitial State:")
-        print((self.initial_cube))
+        print(self.magic_cube.to_nested(self.initial_cube))
         print("\nFinal State:")
-        print((self.final_cube))
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Plot changes in objective function and acceptance probability over iterations
-        plt.figure(figsize=(12, 5))
-
-        # Plot objective function values over iterations
-        plt.subplot(1, 2, 1)
-        plt.plot(self.objective_values, label='Objective Value')
-        plt.xlabel("Iterations")
-        plt.ylabel("Objective Function Value")
-        plt.title("Objective Function vs. Iterations")
-        plt.legend()
-
-        # Plot acceptance probabilities over iterations
-        plt.subplot(1, 2, 2)
-        plt.plot(self.acceptance_probabilities, label='Acceptance Probability')
-        plt.xlabel("Iterations")
-        plt.ylabel("Acceptance Probability")
-        plt.title("Acceptance Probability vs. Iterations")
-        plt.legend()
-        plt.tight_layout()
-        
-        # Save the plot
-        plt.savefig(f'src/data/simulated_annealing_plot_{timestamp}.png', format='png')
-        plt.show()
+        print(self.magic_cube.to_nested(self.final_cube))
+
+        # Plot changes in objective function and acceptance probability over iterations and save it
+        render_plot(self.plot_spec(), show=show)
         
 
 if __name__ == "__main__":
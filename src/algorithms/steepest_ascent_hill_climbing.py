@@ -1,70 +1,71 @@
-import datetime
-import itertools
 import time
-import copy
-import matplotlib.pyplot as plt
 from cube.cube import MagicCube
+from cube.neighborhood import NeighborhoodEvaluator, SwapDeltaTable
+from reporting.progress import default_progress
+from reporting.render import render_plot
+from reporting.trajectory import make_recorder
 
 # The Steepest Ascent Hill Climbing class
 class SteepestAscentHillClimbing:
-    def __init__(self, magic_cube):
+    def __init__(self, magic_cube, incremental=False, stop_event=None, time_limit=None, progress=None,
+                 trajectory=None, target_value=0):
         self.magic_cube = magic_cube
+        # Checked before each neighbourhood scan, so a climb that reaches it skips the final full scan
+        self.target_value = target_value
+        self.incremental = incremental
+        self.stop_event = stop_event
+        self.stopped = False
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
         self.iterations = 0
         self.start_time = None
         self.end_time = None
-        self.objective_values = []
-        self.initial_cube = copy.deepcopy(self.magic_cube.data)
+        # trajectory holds TrajectoryRecorder options (capacity, strategy, spill directory)
+        self.objective_values = make_recorder(trajectory, 'objective_values', 'q')
+        self.initial_cube = self.magic_cube.snapshot()
         self.final_cube = None
-
-    def objective_function(self, cube_data):
-        """Calculate the objective function value for a given cube state."""
-        original_data = self.magic_cube.data
-        self.magic_cube.data = cube_data
-        objective_value = self.magic_cube.objective_function()
-        self.magic_cube.data = original_data  
-        return -objective_value  
+        self.final_objective = None
+        self.neighborhood = NeighborhoodEvaluator.for_cube(self.magic_cube)
+        # Every iteration weighs all n_pairs swaps, whether rescored in full or kept incrementally
+        self.evaluations = 0
 
     def find_best_neighbor(self):
         """Find the best neighboring configuration by checking all possible swaps."""
-        indices = [(i, j, k) for i in range(self.magic_cube.size) for j in range(self.magic_cube.size) for k in range(self.magic_cube.size)]
-        best_neighbor = None
-        best_value = float('-inf')
-        current_data = copy.deepcopy(self.magic_cube.data)  # Copy the current cube data for evaluation
-
-        for pos1, pos2 in itertools.combinations(indices, 2):
-            # Create a deep copy of the cube data to test the swap
-            temp_data = copy.deepcopy(current_data)
-            # Perform the swap on the temporary data
-            x1, y1, z1 = pos1
-            x2, y2, z2 = pos2
-            temp_data[x1][y1][z1], temp_data[x2][y2][z2] = temp_data[x2][y2][z2], temp_data[x1][y1][z1]
-
-            # Evaluate this neighbor
-            neighbor_value = self.objective_function(temp_data)
-            if neighbor_value > best_value:
-                best_neighbor = (pos1, pos2)
-                best_value = neighbor_value
-
+        # All swaps are scored in one batch from the cached line sums
+        best_neighbor, best_delta = self.neighborhood.best_swap(self.magic_cube)
+        self.evaluations += NeighborhoodEvaluator.for_cube(self.magic_cube).n_pairs
+        best_value = -(self.magic_cube.objective_function() + best_delta)
         return best_neighbor, best_value
 
     def run(self):
         """Run the Steepest Ascent Hill Climbing algorithm with search log display."""
+        if self.incremental:
+            # Keep the swap deltas between iterations and rescore only the pairs a move touches
+            self.neighborhood = SwapDeltaTable(self.magic_cube)
         self.start_time = time.time()
-        current_value = self.objective_function(self.magic_cube.data)
-        self.objective_values.append(-current_value)  # Store initial objective value
+        current_value = -self.magic_cube.objective_function()
+        self.objective_values.record(-current_value)  # Store initial objective value
 
         while True:
+            # Allow a coordinator (e.g. parallel random restarts) to cancel the climb
+            if self.stop_event is not None and self.stop_event.is_set():
+                self.stopped = True
+                break
+            if -current_value <= self.target_value:
+                break
+            if self.time_limit is not None and time.time() - self.start_time >= self.time_limit:
+                break
+
             best_neighbor, best_value = self.find_best_neighbor()
             self.iterations += 1
 
             # Track objective function over iterations
-            self.objective_values.append(-best_value)
+            self.objective_values.record(-best_value)
 
-            # Calculate elapsed time for this iteration
-            elapsed_time = time.time() - self.start_time
-
-            # Log iteration details to the console
-            print(f"Iteration {self.iterations}: Objective = {-best_value}, Time = {elapsed_time:.4f} seconds")
+            # Report progress when the sink's rate limit allows it
+            if self.progress.due():
+                self.progress.emit('iteration', self.iterations, objective=-best_value,
+                                   time=time.time() - self.start_time)
 
             # Stop if no better neighbor is found
             if best_neighbor is None or best_value <= current_value:
@@ -72,39 +73,54 @@ class SteepestAscentHillClimbing:
 
             # Apply the best swap to the actual cube
             pos1, pos2 = best_neighbor
-            self.magic_cube.swap(pos1, pos2)
+            self.neighborhood.apply_swap(self.magic_cube, pos1, pos2)
             current_value = best_value
 
         self.end_time = time.time()
         # Capture the final state of the cube
-        self.final_cube = copy.deepcopy(self.magic_cube.data)
-
-    def report(self):
+        self.final_cube = self.magic_cube.snapshot()
+        self.final_objective = self.magic_cube.objective_function()
+        self.objective_values.close()
+        self.progress.flush()
+
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        return {
+            'algorithm': 'steepest_ascent_hill_climbing',
+            'final_objective': self.final_objective,
+            'iterations': self.iterations,
+            'evaluations': self.evaluations,
+            'duration': self.end_time - self.start_time,
+            'final_state': list(self.final_cube),
+        }
+
+    def plot_spec(self):
+        """Describe the progress plot as plain data for reporting.render."""
+        steps, values = self.objective_values.series()
+        return {
+            'name': 'steepest_ascent_hill_climbing',
+            'figsize': [10, 6],
+            'panels': [{
+                'title': 'Objective Function Value over Iterations',
+                'xlabel': 'Iterations',
+                'ylabel': 'Objective Function Value',
+                'grid': True,
+                'legend': True,
+                'lines': [{'x': steps, 'y': values, 'label': 'Objective Function'}],
+            }],
+        }
+
+    def report(self, show=None):
         """Display the results and plot the progress."""
         print("\nExperiment Report:")
-        print(f"Initial State: {self.initial_cube}")
-        print(f"Final State: {self.final_cube}")
-        print(f"Final Objective Value: {self.objective_values[-1]}")
+        print(f"Initial State: {self.magic_cube.to_nested(self.initial_cube)}")
+        print(f"Final State: {self.magic_cube.to_nested(self.final_cube)}")
+        print(f"Final Objective Value: {self.objective_values.last}")
         print(f"Total Iterations: {self.iterations}")
         print(f"Duration: {self.end_time - self.start_time:.4f} seconds")
 
-        # Generate the current timestamp in the desired format (e.g., YYYYMMDD_HHMMSS)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Plotting
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.objective_values, label='Objective Function')
-        plt.xlabel('Iterations')
-        plt.ylabel('Objective Function Value')
-        plt.title('Objective Function Value over Iterations')
-        plt.legend()
-        plt.grid(True)
-
-        # Save the plot with a timestamp in the filename
-        plt.savefig(f'src/data/steepest_ascent_hill_climbing_plot_{timestamp}.png', format='png')
-
-        # Display the plot
-        plt.show()
+        # Save the plot with a timestamp in the filename, and display it when there is a screen
+        render_plot(self.plot_spec(), show=show)
 
 
 if __name__ == "__main__":
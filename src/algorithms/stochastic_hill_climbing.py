@@ -1,102 +1,122 @@
-import random
-import copy
 import time
-import datetime
-import matplotlib.pyplot as plt
 from cube.cube import MagicCube  
+from cube.moves import make_moves
+from reporting.progress import default_progress
+from reporting.render import render_plot
+from reporting.trajectory import make_recorder
 
 class StochasticHillClimbing:
-    def __init__(self, magic_cube, max_trials=10000):
+    def __init__(self, magic_cube, max_trials=10000, time_limit=None, progress=None, trajectory=None, moves=None,
+                 target_value=0):
         self.magic_cube = magic_cube
+        # Diperiksa setiap percobaan; hanya tukar yang memperbaiki diterima, jadi biaya saat ini yang terbaik
+        self.target_value = target_value
         self.max_trials = max_trials
+        # None untuk tukar acak seragam, porsi terpandu untuk cube.moves.GuidedMoves, atau generator langkah
+        self.moves = make_moves(moves)
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
         self.iterations = 0
         self.start_time = None
         self.end_time = None
-        self.objective_values = []  
-        self.initial_cube = copy.deepcopy(self.magic_cube.data)  
+        # Riwayat objektif dengan memori terbatas; trajectory berisi opsi TrajectoryRecorder
+        self.objective_values = make_recorder(trajectory, 'objective_values', 'q')
+        self.initial_cube = self.magic_cube.snapshot()  
         self.final_cube = None  
+        self.final_objective = None
 
     def run(self):
         # Simpan waktu mulai
         self.start_time = time.time()
 
         # Nilai objektif dari kondisi awal kubus
-        current_cube = copy.deepcopy(self.initial_cube)
-        current_cost = self.objective_function(current_cube)
-        self.objective_values.append(current_cost)
+        cube = self.magic_cube
+        current_cost = cube.objective_function()
+        self.objective_values.record(current_cost)
+        deadline = None if self.time_limit is None else self.start_time + self.time_limit
+        progress = self.progress
+        record = self.objective_values.record
+        propose = self.moves.propose
 
         for _ in range(self.max_trials):
+            # Berhenti jika batas waktu habis
+            if deadline is not None and time.time() >= deadline:
+                break
             self.iterations += 1
 
-            # Buat tetangga dengan menukar dua posisi acak
-            neighbor_cube = copy.deepcopy(current_cube)
-            pos1 = self._random_position()
-            pos2 = self._random_position(different_from=pos1)
-            self.swap(neighbor_cube, pos1, pos2)
+            # Pilih dua sel (offset datar) sebagai tetangga
+            i, j = propose(cube)
 
-            # Hitung nilai objektif dari tetangga
-            neighbor_cost = self.objective_function(neighbor_cube)
+            # Hitung perubahan nilai objektif tanpa menyalin atau mengubah kubus
+            delta = cube.swap_delta_at(i, j)
 
-            # Jika tetangga lebih baik, pindah ke state tersebut
-            if neighbor_cost < current_cost:
-                current_cube = neighbor_cube
-                current_cost = neighbor_cost
+            # Jika tetangga lebih baik, baru tukar di tempat
+            if delta < 0:
+                cube.apply_swap_at(i, j)
+                current_cost += delta
 
             # Simpan nilai objektif untuk setiap percobaan
-            self.objective_values.append(current_cost)
+            record(current_cost)
+
+            # Laporan progres hanya saat diizinkan oleh batas laju sink
+            if progress.due():
+                progress.emit('iteration', self.iterations, objective=current_cost,
+                              time=time.time() - self.start_time)
 
-            # Berhenti jika solusi optimal (biaya 0) ditemukan
-            if current_cost == 0:
-                print(f"Solusi optimal ditemukan pada iterasi {self.iterations}")
+            # Berhenti jika target (default: solusi optimal, biaya 0) tercapai
+            if current_cost <= self.target_value:
+                progress.emit('solved', self.iterations, objective=current_cost)
                 break
 
         # Simpan waktu selesai
         self.end_time = time.time()
-        self.final_cube = current_cube  
-
-    def objective_function(self, cube_data):
-        original_data = self.magic_cube.data
-        self.magic_cube.data = cube_data
-        cost = self.magic_cube.objective_function()
-        self.magic_cube.data = original_data  
-        return cost
-
-    def _random_position(self, different_from=None):
-        size = self.magic_cube.size
-        while True:
-            position = (random.randint(0, size - 1),
-                        random.randint(0, size - 1),
-                        random.randint(0, size - 1))
-            if position != different_from:
-                return position
-
-    def swap(self, cube_data, pos1, pos2):
-        x1, y1, z1 = pos1
-        x2, y2, z2 = pos2
-        cube_data[x1][y1][z1], cube_data[x2][y2][z2] = cube_data[x2][y2][z2], cube_data[x1][y1][z1]
-
-    def report(self):
+        self.final_cube = self.magic_cube.snapshot()
+        self.final_objective = current_cost
+        self.objective_values.close()
+        progress.flush()
+
+    def result(self):
+        """Ringkasan hasil dalam bentuk dict untuk keluaran yang dapat dibaca mesin."""
+        return {
+            'algorithm': 'stochastic_hill_climbing',
+            'final_objective': self.final_objective,
+            'iterations': self.iterations,
+            # Satu tukar dinilai per iterasi
+            'evaluations': self.iterations,
+            'guided_moves': getattr(self.moves, 'guided_moves', 0),
+            'duration': self.end_time - self.start_time,
+            'final_state': list(self.final_cube),
+        }
+
+    def plot_spec(self):
+        """Deskripsi plot hasil sebagai data biasa untuk reporting.render."""
+        steps, values = self.objective_values.series()
+        return {
+            'name': 'stochastic_hill_climbing',
+            'figsize': [10, 5],
+            'panels': [{
+                'title': 'Performa Stochastic Hill Climbing',
+                'xlabel': 'Iterasi',
+                'ylabel': 'Nilai Objective Function',
+                'grid': True,
+                'lines': [{'x': steps, 'y': values}],
+            }],
+        }
+
+    def report(self, show=None):
         duration = self.end_time - self.start_time
         print("===== Laporan Hasil Stochastic Hill Climbing =====")
         print(f"Durasi Pencarian       : {duration:.4f} detik")
         print(f"Total Iterasi          : {self.iterations}")
-        print(f"Nilai Objective Awal   : {self.objective_values[0]}")
+        print(f"Nilai Objective Awal   : {self.objective_values.first}")
         print(f"Initial State: ")
-        print((self.initial_cube))
-        print(f"Nilai Objective Akhir  : {self.objective_values[-1]}")
+        print(self.magic_cube.to_nested(self.initial_cube))
+        print(f"Nilai Objective Akhir  : {self.objective_values.last}")
         print(f"Final State: ")
-        print((self.final_cube))
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        
+        print(self.magic_cube.to_nested(self.final_cube))
+
         # Plot hasil
-        plt.figure(figsize=(10, 5))
-        plt.plot(self.objective_values)
-        plt.xlabel('Iterasi')
-        plt.ylabel('Nilai Objective Function')
-        plt.title('Performa Stochastic Hill Climbing')
-        plt.grid(True)
-        plt.savefig(f'src/data/stochastic_hill_climbing_plot_{timestamp}.png', format='png')
-        plt.show()
+        render_plot(self.plot_spec(), show=show)
         
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+import time
+from collections import deque
+import numpy as np
+from cube.cube import MagicCube
+from cube.neighborhood import NeighborhoodEvaluator, SwapDeltaTable
+from reporting.progress import default_progress
+from reporting.render import render_plot
+from reporting.trajectory import make_recorder
+
+class TabuSearch:
+    """Best-admissible-swap search with short-term tabu on moved cells and long-term state memory.
+
+    After a swap both cells stay tabu for tabu_tenure iterations. A tabu swap is still
+    allowed when it would beat the best objective found so far (aspiration). The last
+    state_memory states are remembered by their Zobrist hashes, so swaps leading back to one
+    of them are skipped in O(1) without comparing cube contents. Like the tabu list, the
+    memory is bounded: older states drop out and may be visited again.
+    """
+
+    def __init__(self, magic_cube, max_iterations=1000, tabu_tenure=10, candidates=64, incremental=True,
+                 state_memory=1000, time_limit=None, progress=None, trajectory=None, target_value=0):
+        if state_memory < 1:
+            raise ValueError("state_memory must be at least 1.")
+        self.magic_cube = magic_cube
+        # Checked before every iteration against the best cube so far, which a tabu move may have left behind
+        self.target_value = target_value
+        self.max_iterations = max_iterations
+        self.tabu_tenure = tabu_tenure
+        self.candidates = candidates  # Best swaps examined per iteration before giving up
+        self.state_memory = state_memory  # Recent state hashes kept to avoid revisits
+        self.incremental = incremental
+        self.time_limit = time_limit
+        self.progress = default_progress(progress)
+        self.iterations = 0
+        self.aspirations = 0
+        self.revisits_avoided = 0
+        self.start_time = None
+        self.end_time = None
+        self.objective_values = make_recorder(trajectory, 'objective_values', 'q')
+        self.initial_cube = self.magic_cube.snapshot()
+        self.final_cube = None
+        self.final_objective = None
+        self.neighborhood = NeighborhoodEvaluator.for_cube(self.magic_cube)
+
+    def swap_deltas(self):
+        """Objective change of every swap, in the evaluator's pair order."""
+        if self.incremental:
+            return self.neighborhood.deltas
+        return self.neighborhood.deltas(self.magic_cube)
+
+    def run(self):
+        cube = self.magic_cube
+        evaluator = NeighborhoodEvaluator.for_cube(cube)
+        if self.incremental:
+            # Keep the swap deltas between iterations and rescore only the pairs a move touches
+            self.neighborhood = SwapDeltaTable(cube)
+        first, second = evaluator.first, evaluator.second
+        blocked = np.iinfo(np.int64).max
+        tabu_until = np.zeros(evaluator.n_cells, dtype=np.int64)
+        # The set answers membership; the deque remembers arrival order so the oldest hash can be dropped
+        recent = deque([cube.state_hash])
+        visited = set(recent)
+
+        self.start_time = time.time()
+        current_objective = cube.objective_function()
+        best_objective = current_objective
+        best_cube = cube.snapshot()
+        self.objective_values.record(current_objective)
+
+        while self.iterations < self.max_iterations and best_objective > self.target_value:
+            if self.time_limit is not None and time.time() - self.start_time >= self.time_limit:
+                break
+            self.iterations += 1
+
+            deltas = self.swap_deltas().astype(np.int64)
+            tabu = (tabu_until[first] >= self.iterations) | (tabu_until[second] >= self.iterations)
+            aspiration = tabu & (current_objective + deltas < best_objective)
+            scores = np.where(tabu & ~aspiration, blocked, deltas)
+
+            # Only the few best admissible swaps are ordered; the first to an unvisited state wins
+            count = min(self.candidates, len(scores))
+            ranked = np.argpartition(scores, count - 1)[:count]
+            ranked = ranked[np.argsort(scores[ranked], kind='stable')]
+            move = None
+            for pair in ranked:
+                if scores[pair] == blocked:
+                    break
+                i, j = int(first[pair]), int(second[pair])
+                if cube.swap_hash(i, j) in visited:
+                    self.revisits_avoided += 1
+                    continue
+                move = pair
+                break
+            if move is None:
+                break
+
+            if aspiration[move]:
+                self.aspirations += 1
+            pos1, pos2 = evaluator.swap_positions(move)
+            self.neighborhood.apply_swap(cube, pos1, pos2)
+            current_objective = cube.objective_function()
+            recent.append(cube.state_hash)
+            visited.add(cube.state_hash)
+            if len(recent) > self.state_memory:
+                visited.discard(recent.popleft())
+            tabu_until[i] = tabu_until[j] = self.iterations + self.tabu_tenure
+
+            if current_objective < best_objective:
+                best_objective = current_objective
+                cube.snapshot_into(best_cube)
+            self.objective_values.record(current_objective)
+
+            if self.progress.due():
+                self.progress.emit('iteration', self.iterations, objective=current_objective,
+                                   best_objective=best_objective, time=time.time() - self.start_time)
+
+        self.end_time = time.time()
+        # The search may have walked uphill since its best state; end on the best one
+        cube.restore(best_cube)
+        self.final_cube = best_cube
+        self.final_objective = best_objective
+        self.objective_values.close()
+        self.progress.flush()
+
+    def result(self):
+        """Summarize the run as a plain dict for machine-readable output."""
+        return {
+            'algorithm': 'tabu_search',
+            'final_objective': self.final_objective,
+            'iterations': self.iterations,
+            # Every iteration weighs all swaps
+            'evaluations': self.iterations * NeighborhoodEvaluator.for_cube(self.magic_cube).n_pairs,
+            'aspirations': self.aspirations,
+            'revisits_avoided': self.revisits_avoided,
+            'duration': self.end_time - self.start_time,
+            'final_state': list(self.final_cube),
+        }
+
+    def plot_spec(self):
+        """Describe the progress plot as plain data for reporting.render."""
+        steps, values = self.objective_values.series()
+        return {
+            'name': 'tabu_search',
+            'figsize': [10, 6],
+            'panels': [{
+                'title': 'Objective Function Value over Iterations',
+                'xlabel': 'Iterations',
+                'ylabel': 'Objective Function Value',
+                'grid': True,
+                'legend': True,
+                'lines': [{'x': steps, 'y': values, 'label': 'Objective Function'}],
+            }],
+        }
+
+    def report(self, show=None):
+        """Display the results and plot the progress."""
+        print("\nExperiment Report:")
+        print(f"Initial State: {self.magic_cube.to_nested(self.initial_cube)}")
+        print(f"Final State: {self.magic_cube.to_nested(self.final_cube)}")
+        print(f"Final Objective Value: {self.final_objective}")
+        print(f"Total Iterations: {self.iterations}")
+        print(f"Aspiration Moves: {self.aspirations}")
+        print(f"Revisits Avoided: {self.revisits_avoided}")
+        print(f"Duration: {self.end_time - self.start_time:.4f} seconds")
+
+        render_plot(self.plot_spec(), show=show)
+
+
+if __name__ == "__main__":
+    cube = MagicCube(size=5)
+    tabu_search = TabuSearch(cube, max_iterations=1000, tabu_tenure=10)
+    tabu_search.run()
+    tabu_search.report()
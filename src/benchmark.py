@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from algorithms.genetic_algorithm import GeneticAlgorithm
+from algorithms.hill_climbing_with_sideways_move import HillClimbingWithSidewaysMove
+from algorithms.random_restart_hill_climbing import RandomRestartHillClimbing
+from algorithms.simulated_annealing import SimulatedAnnealing
+from algorithms.steepest_ascent_hill_climbing import SteepestAscentHillClimbing
+from algorithms.stochastic_hill_climbing import StochasticHillClimbing
+from algorithms.tabu_search import TabuSearch
+from cube.cube import MagicCube
+from reporting.progress import SilentProgress
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'benchmark_baseline.json')
+
+# Fixed workload per algorithm; a step is whatever the algorithm's result() counts as an iteration
+ALGORITHM_BENCHMARKS = {
+    'steepest_ascent_hill_climbing': (SteepestAscentHillClimbing, {}),
+    'stochastic_hill_climbing': (StochasticHillClimbing, {'max_trials': 20000}),
+    'hill_climbing_with_sideways_move': (HillClimbingWithSidewaysMove, {'max_sideways': 10}),
+    'random_restart_hill_climbing': (RandomRestartHillClimbing, {'max_restarts': 2}),
+    'simulated_annealing': (SimulatedAnnealing, {'initial_temp': 1000, 'cooling_rate': 0.95}),
+    'genetic_algorithm': (GeneticAlgorithm, {'amount_iteration': 20, 'population_size': 20}),
+    'tabu_search': (TabuSearch, {'max_iterations': 200}),
+}
+
+def best_rate(func, operations, repeat):
+    """Run func repeat times and return the best rate in operations per second."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return operations / best
+
+def bench_cube(size, seed, repeat, operations=20000):
+    """Objective evaluations, swap deltas, swaps and neighborhood scans per second for one size."""
+    random.seed(seed)
+    cube = MagicCube(size)
+    moves = [cube.random_move() for _ in range(operations)]
+
+    def objective_function():
+        for _ in range(operations):
+            cube.objective_function()
+
+    def full_evaluation():
+        for _ in range(operations // 100):
+            cube.refresh_line_sums()
+
+    def swap_delta():
+        for i, j in moves:
+            cube.swap_delta_at(i, j)
+
+    def swap():
+        for i, j in moves:
+            cube.apply_swap_at(i, j)
+
+    climber = SteepestAscentHillClimbing(cube)
+    scans = 10
+
+    def neighborhood_scan():
+        for _ in range(scans):
+            climber.find_best_neighbor()
+
+    # Build the per-size neighborhood tables before anything is timed
+    climber.find_best_neighbor()
+    return {
+        'objective_function': best_rate(objective_function, operations, repeat),
+        'full_evaluation': best_rate(full_evaluation, operations // 100, repeat),
+        'swap_delta': best_rate(swap_delta, operations, repeat),
+        'swap': best_rate(swap, operations, repeat),
+        'neighborhood_scan': best_rate(neighborhood_scan, scans, repeat),
+    }
+
+def bench_algorithm(name, size, seed, repeat):
+    """Steps per second of one algorithm on a fixed seed, with progress reporting off."""
+    algorithm_class, params = ALGORITHM_BENCHMARKS[name]
+    params = dict(params, progress=SilentProgress())
+    if algorithm_class is RandomRestartHillClimbing:
+        params['seed'] = seed
+    best = 0.0
+    for _ in range(repeat):
+        random.seed(seed)
+        algorithm = algorithm_class(MagicCube(size), **params)
+        start = time.perf_counter()
+        algorithm.run()
+        elapsed = time.perf_counter() - start
+        best = max(best, algorithm.result()['iterations'] / elapsed)
+    return best
+
+def run_benchmarks(sizes, seed=0, repeat=3, algorithms=None):
+    """Return {'size=N/metric': rate} for every cube metric and algorithm at every size."""
+    algorithms = list(ALGORITHM_BENCHMARKS) if algorithms is None else algorithms
+    results = {}
+    for size in sizes:
+        print(f"Benchmarking size {size}...", file=sys.stderr)
+        for metric, rate in bench_cube(size, seed, repeat).items():
+            results[f'size={size}/{metric}'] = rate
+        for name in algorithms:
+            results[f'size={size}/{name}_steps'] = bench_algorithm(name, size, seed, repeat)
+    return results
+
+def save_baseline(path, results, sizes, seed):
+    """Write results with enough context to judge whether a later comparison is fair."""
+    baseline = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'sizes': sizes,
+        'seed': seed,
+        'results': results,
+    }
+    with open(path, 'w') as file:
+        json.dump(baseline, file, indent=2)
+
+def compare(results, baseline, tolerance):
+    """Print every metric next to its baseline and return the names that got slower than allowed."""
+    regressions = []
+    print(f"{'Metric':<55} {'Baseline':>14} {'Current':>14} {'Ratio':>7}")
+    for metric, rate in results.items():
+        old_rate = baseline['results'].get(metric)
+        if old_rate is None:
+            print(f"{metric:<55} {'-':>14} {rate:>14.1f} {'new':>7}")
+            continue
+        ratio = rate / old_rate
+        flag = ''
+        if ratio < 1 - tolerance:
+            regressions.append(metric)
+            flag = '  REGRESSION'
+        print(f"{metric:<55} {old_rate:>14.1f} {rate:>14.1f} {ratio:>7.2f}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure Magic Cube evaluation and search throughput.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3, 5, 7], help="Cube sizes (default: 3 5 7)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for every workload (default: 0)")
+    parser.add_argument('--repeat', type=int, default=3, help="Best of this many timings (default: 3)")
+    parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHM_BENCHMARKS), default=None,
+                        help="Only benchmark these algorithms (default: all)")
+    parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, default=None,
+                        help="Save the results as the baseline (default path: src/data/benchmark_baseline.json)")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, default=None,
+                        help="Compare against a saved baseline and exit 1 on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed slowdown before a metric counts as a regression (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.seed, args.repeat, args.algorithms)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+    else:
+        regressions = []
+        for metric, rate in results.items():
+            print(f"{metric:<55} {rate:>14.1f} /s")
+
+    if args.save:
+        save_baseline(args.save, results, args.sizes, args.seed)
+        print(f"\nBaseline saved to {args.save}")
+
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) slower than the baseline by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,67 +1,188 @@
 import random
 import math
+from array import array
+from cube.line_index import LineIndex
+from cube.zobrist import ZobristTable
 
 class MagicCube:
     """5x5x5 Magic Cube with local search functionality"""
 
+    # Cells live in one flat unsigned 16-bit buffer indexed by (x * size + y) * size + z;
+    # positions is its inverse, the offset holding each value
+    __slots__ = ('size', 'magic_number', 'line_index', 'lines', 'cell_lines', 'cells', 'positions', 'line_sums',
+                 'objective_value', 'zobrist', 'state_hash')
+
     def __init__(self, size=5):
         self.size = size
-        self.data = self.initialize_cube()
         self.magic_number = self.calculate_magic_number()
+        # Line tables are built once per size and shared by every cube of that size
+        self.line_index = LineIndex.for_size(size)
+        self.lines = self.line_index.lines
+        self.cell_lines = self.line_index.cell_lines
+        self.zobrist = ZobristTable.for_size(size)
+        self.cells = self.initialize_cube()
+        self.refresh_line_sums()
 
     def initialize_cube(self):
         """Initialize the cube with numbers 1 to size^3."""
         n = self.size ** 3
-        numbers = list(range(1, n + 1))
+        numbers = array('H', range(1, n + 1))
         random.shuffle(numbers)
-        # Create a 3D cube structure with the shuffled numbers
-        return [[[numbers.pop() for _ in range(self.size)] for _ in range(self.size)] for _ in range(self.size)]
+        return numbers
 
     def calculate_magic_number(self):
         """Calculate the target magic number for each row, column, and diagonal."""
         n = self.size
         return n * (n ** 3 + 1) // 2
 
+    def index(self, pos):
+        """Convert an (x, y, z) position into its offset in the flat cell buffer."""
+        x, y, z = pos
+        return (x * self.size + y) * self.size + z
+
+    def position(self, index):
+        """Convert a flat cell offset back into its (x, y, z) position."""
+        xy, z = divmod(index, self.size)
+        x, y = divmod(xy, self.size)
+        return x, y, z
+
+    def __getitem__(self, pos):
+        return self.cells[self.index(pos)]
+
+    def refresh_line_sums(self):
+        """Recompute the cached line sums, objective value, state hash and positions from scratch."""
+        cells = self.cells
+        positions = array('H', bytes(2 * (len(cells) + 1)))
+        for offset, value in enumerate(cells):
+            positions[value] = offset
+        self.positions = positions
+        self.line_sums = self.line_index.line_sums(cells)
+        self.objective_value = sum(abs(line_sum - self.magic_number) for line_sum in self.line_sums)
+        self.state_hash = self.zobrist.hash(cells)
+
+    def snapshot(self):
+        """Return a copy of the cell buffer."""
+        return self.cells[:]
+
+    def snapshot_into(self, buffer):
+        """Copy the cells into an existing buffer of the same size without allocating."""
+        buffer[:] = self.cells
+
+    def restore(self, snapshot):
+        """Load a cell buffer produced by snapshot() or initialize_cube()."""
+        self.cells[:] = snapshot
+        self.refresh_line_sums()
+
+    def copy(self):
+        """Return an independent cube with the same state, sharing the read-only line tables."""
+        clone = MagicCube.__new__(MagicCube)
+        clone.size = self.size
+        clone.magic_number = self.magic_number
+        clone.line_index = self.line_index
+        clone.lines = self.lines
+        clone.cell_lines = self.cell_lines
+        clone.zobrist = self.zobrist
+        clone.cells = self.cells[:]
+        clone.positions = self.positions[:]
+        clone.line_sums = self.line_sums[:]
+        clone.objective_value = self.objective_value
+        clone.state_hash = self.state_hash
+        return clone
+
+    def to_nested(self, cells=None):
+        """Return the current state, or a snapshot, as a nested [x][y][z] list for reports."""
+        if cells is None:
+            cells = self.cells
+        n = self.size
+        return [[list(cells[(x * n + y) * n:(x * n + y + 1) * n]) for y in range(n)] for x in range(n)]
+
     def objective_function(self):
         """Calculate the total deviation from the magic number for rows, columns, pillars, and diagonals."""
-        total_difference = 0
-
-        # Check rows, columns, and pillars
-        for i in range(self.size):
-            for j in range(self.size):
-                # Sum along each row (yz planes)
-                total_difference += abs(sum(self.data[i][j]) - self.magic_number)
-                # Sum along each column (xz planes)
-                total_difference += abs(sum(self.data[k][i][j] for k in range(self.size)) - self.magic_number)
-                # Sum along each pillar (xy planes)
-                total_difference += abs(sum(self.data[j][k][i] for k in range(self.size)) - self.magic_number)
-
-        # Check 3D space diagonals
-        space_diagonals = [
-            sum(self.data[i][i][i] for i in range(self.size)),  # (0,0,0) to (size-1,size-1,size-1)
-            sum(self.data[i][i][self.size - 1 - i] for i in range(self.size)),  # (0,0,size-1) to (size-1,size-1,0)
-            sum(self.data[i][self.size - 1 - i][i] for i in range(self.size)),  # (0,size-1,0) to (size-1,0,size-1)
-            sum(self.data[i][self.size - 1 - i][self.size - 1 - i] for i in range(self.size))  # (0,size-1,size-1) to (size-1,0,0)
-        ]
-        total_difference += sum(abs(diag - self.magic_number) for diag in space_diagonals)
-
-        # Check 2D plane diagonals in each slice
-        for i in range(self.size):
-            # Diagonals within each xy plane
-            total_difference += abs(sum(self.data[i][j][j] for j in range(self.size)) - self.magic_number)
-            total_difference += abs(sum(self.data[i][j][self.size - 1 - j] for j in range(self.size)) - self.magic_number)
-            # Diagonals within each xz plane
-            total_difference += abs(sum(self.data[j][i][j] for j in range(self.size)) - self.magic_number)
-            total_difference += abs(sum(self.data[j][i][self.size - 1 - j] for j in range(self.size)) - self.magic_number)
-            # Diagonals within each yz plane
-            total_difference += abs(sum(self.data[j][j][i] for j in range(self.size)) - self.magic_number)
-            total_difference += abs(sum(self.data[j][self.size - 1 - j][i] for j in range(self.size)) - self.magic_number)
-
-        return total_difference
+        # The value is kept up to date by refresh_line_sums and apply_swap
+        return self.objective_value
+
+    def swap_delta(self, pos1, pos2):
+        """Return the change in objective value that swapping pos1 and pos2 would cause."""
+        return self.swap_delta_at(self.index(pos1), self.index(pos2))
+
+    def swap_delta_at(self, i, j):
+        """swap_delta for flat cell offsets; allocation free for use in inner loops."""
+        cells = self.cells
+        diff = cells[j] - cells[i]
+        if diff == 0:
+            return 0
+
+        lines1 = self.cell_lines[i]
+        lines2 = self.cell_lines[j]
+        line_sums = self.line_sums
+        magic_number = self.magic_number
+        delta = 0
+        # Lines through both cells keep their sum, the others gain or lose diff
+        for line in lines1:
+            if line not in lines2:
+                line_sum = line_sums[line]
+                delta += abs(line_sum + diff - magic_number) - abs(line_sum - magic_number)
+        for line in lines2:
+            if line not in lines1:
+                line_sum = line_sums[line]
+                delta += abs(line_sum - diff - magic_number) - abs(line_sum - magic_number)
+        return delta
+
+    def apply_swap(self, pos1, pos2):
+        """Swap two numbers and update the cached line sums in place. Returns the objective delta."""
+        return self.apply_swap_at(self.index(pos1), self.index(pos2))
+
+    def apply_swap_at(self, i, j):
+        """apply_swap for flat cell offsets; allocation free for use in inner loops."""
+        cells = self.cells
+        diff = cells[j] - cells[i]
+        if diff == 0:
+            return 0
+
+        lines1 = self.cell_lines[i]
+        lines2 = self.cell_lines[j]
+        line_sums = self.line_sums
+        magic_number = self.magic_number
+        delta = 0
+        for line in lines1:
+            if line not in lines2:
+                line_sum = line_sums[line]
+                line_sums[line] = line_sum + diff
+                delta += abs(line_sum + diff - magic_number) - abs(line_sum - magic_number)
+        for line in lines2:
+            if line not in lines1:
+                line_sum = line_sums[line]
+                line_sums[line] = line_sum - diff
+                delta += abs(line_sum - diff - magic_number) - abs(line_sum - magic_number)
+
+        # Zobrist update inlined from ZobristTable.swap_delta: swap the two cells' keys
+        keys = self.zobrist.keys
+        stride = self.zobrist.stride
+        a = cells[i]
+        b = cells[j]
+        self.state_hash ^= keys[i * stride + a] ^ keys[i * stride + b] ^ keys[j * stride + a] ^ keys[j * stride + b]
+        cells[i] = b
+        cells[j] = a
+        positions = self.positions
+        positions[a] = j
+        positions[b] = i
+        self.objective_value += delta
+        return delta
+
+    def swap_hash(self, i, j):
+        """Return the state hash the cube would have after swapping flat offsets i and j."""
+        return self.state_hash ^ self.zobrist.swap_delta(self.cells, i, j)
+
+    def random_move(self):
+        """Pick two distinct flat cell offsets uniformly at random."""
+        n_cells = len(self.cells)
+        i = random.randrange(n_cells)
+        j = random.randrange(n_cells - 1)
+        # Skip over i so every other cell is equally likely
+        if j >= i:
+            j += 1
+        return i, j
 
     def swap(self, pos1, pos2):
         """Swap two numbers within the cube."""
-        x1, y1, z1 = pos1
-        x2, y2, z2 = pos2
-        # Swap values in the data attribute
-        self.data[x1][y1][z1], self.data[x2][y2][z2] = self.data[x2][y2][z2], self.data[x1][y1][z1]
+        self.apply_swap(pos1, pos2)
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+class EvaluationCache:
+    """Bounded map from a state's Zobrist hash to something computed from that state.
+
+    Lookups move an entry to the back; once max_size entries are held, each insert evicts
+    the least recently used one. Hits and misses are counted so callers can report how
+    many evaluations the cache saved.
+    """
+
+    def __init__(self, max_size=100000):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return the value stored for key, or None on a miss."""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        entries = self.entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def lookup(self, key, compute):
+        """Return the value for key, calling compute() and storing its result on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,122 @@
+from array import array
+from operator import itemgetter
+
+ROW, COLUMN, PILLAR, PLANE_DIAGONAL, SPACE_DIAGONAL = range(5)
+KIND_NAMES = ('row', 'column', 'pillar', 'plane_diagonal', 'space_diagonal')
+
+class LineIndex:
+    """The lines checked by the objective for one cube size, built once and shared.
+
+    Every line is a run of size flat cell offsets. Lines are kept both as compact integer
+    arrays (line_cells, and the cell -> line map in CSR form as cell_line_offsets and
+    cell_line_ids) and as tuples, which are the fastest form for the per-swap Python loops.
+    NumPy views for batch code are built on first use.
+    """
+
+    _cache = {}
+
+    def __init__(self, size):
+        self.size = size
+        self.n_cells = size ** 3
+        lines, kinds = self.build_lines(size)
+        self.lines = tuple(tuple(line) for line in lines)
+        self.kinds = array('B', kinds)
+        self.n_lines = len(self.lines)
+        self.line_cells = array('i', [cell for line in self.lines for cell in line])
+
+        cell_lines = [[] for _ in range(self.n_cells)]
+        for index, line in enumerate(self.lines):
+            for cell in line:
+                cell_lines[cell].append(index)
+        self.cell_lines = tuple(tuple(line_ids) for line_ids in cell_lines)
+        self.cell_line_offsets = array('i', [0])
+        for line_ids in self.cell_lines:
+            self.cell_line_offsets.append(self.cell_line_offsets[-1] + len(line_ids))
+        self.cell_line_ids = array('i', [line for line_ids in self.cell_lines for line in line_ids])
+
+        # itemgetter pulls a whole line out of the cell buffer in one C call
+        self.getters = tuple(itemgetter(*line) for line in self.lines)
+        self._matrices = {}
+
+    @classmethod
+    def for_size(cls, size):
+        """Return the shared index for a cube size, building it on first use."""
+        index = cls._cache.get(size)
+        if index is None:
+            index = cls._cache[size] = cls(size)
+        return index
+
+    @staticmethod
+    def build_lines(size):
+        """List the cell offsets and kind of every row, column, pillar and diagonal checked by the objective."""
+        n = size
+        last = n - 1
+        at = lambda x, y, z: (x * n + y) * n + z
+        lines = []
+        kinds = []
+
+        def add(kind, line):
+            lines.append(line)
+            kinds.append(kind)
+
+        # Rows, columns, and pillars
+        for i in range(n):
+            for j in range(n):
+                add(ROW, [at(i, j, k) for k in range(n)])
+                add(COLUMN, [at(k, i, j) for k in range(n)])
+                add(PILLAR, [at(j, k, i) for k in range(n)])
+
+        # 3D space diagonals
+        add(SPACE_DIAGONAL, [at(i, i, i) for i in range(n)])
+        add(SPACE_DIAGONAL, [at(i, i, last - i) for i in range(n)])
+        add(SPACE_DIAGONAL, [at(i, last - i, i) for i in range(n)])
+        add(SPACE_DIAGONAL, [at(i, last - i, last - i) for i in range(n)])
+
+        # 2D plane diagonals in each slice
+        for i in range(n):
+            add(PLANE_DIAGONAL, [at(i, j, j) for j in range(n)])
+            add(PLANE_DIAGONAL, [at(i, j, last - j) for j in range(n)])
+            add(PLANE_DIAGONAL, [at(j, i, j) for j in range(n)])
+            add(PLANE_DIAGONAL, [at(j, i, last - j) for j in range(n)])
+            add(PLANE_DIAGONAL, [at(j, j, i) for j in range(n)])
+            add(PLANE_DIAGONAL, [at(j, last - j, i) for j in range(n)])
+
+        return lines, kinds
+
+    def line_sums(self, cells):
+        """Sum of every line of a flat cell buffer."""
+        if self.size == 1:
+            # A one-cell itemgetter returns the value itself rather than a tuple
+            return [cells[line[0]] for line in self.lines]
+        return [sum(getter(cells)) for getter in self.getters]
+
+    def line_matrix(self):
+        """(lines x size) NumPy array of the cells of every line."""
+        matrix = self._matrices.get('line')
+        if matrix is None:
+            import numpy as np
+            matrix = self._matrices['line'] = np.frombuffer(self.line_cells, dtype=np.int32).reshape(self.n_lines, self.size)
+        return matrix
+
+    def cell_line_matrix(self):
+        """(cells x max lines per cell) NumPy array of the lines through every cell, padded with n_lines."""
+        matrix = self._matrices.get('cell_line')
+        if matrix is None:
+            import numpy as np
+            width = max(len(line_ids) for line_ids in self.cell_lines)
+            matrix = np.full((self.n_cells, width), self.n_lines, dtype=np.int32)
+            for cell, line_ids in enumerate(self.cell_lines):
+                matrix[cell, :len(line_ids)] = line_ids
+            self._matrices['cell_line'] = matrix
+        return matrix
+
+    def incidence(self):
+        """(cells x lines) NumPy int8 matrix, 1 where the line runs through the cell."""
+        matrix = self._matrices.get('incidence')
+        if matrix is None:
+            import numpy as np
+            matrix = np.zeros((self.n_cells, self.n_lines), dtype=np.int8)
+            matrix[np.repeat(np.arange(self.n_cells), np.diff(self.cell_line_offsets)),
+                   np.frombuffer(self.cell_line_ids, dtype=np.int32)] = 1
+            self._matrices['incidence'] = matrix
+        return matrix
@@ -0,0 +1,75 @@
+import random
+from cube.cube import MagicCube
+
+class RandomMoves:
+    """Uniform move proposals: two distinct cells picked at random."""
+
+    guided = 0.0
+    # propose(magic_cube) calls the cube's own sampler directly, without an extra frame per move
+    propose = staticmethod(MagicCube.random_move)
+
+
+class GuidedMoves:
+    """Move proposals aimed at the lines that deviate most from the magic number.
+
+    A guided move picks one of the top_lines worst lines, a random cell on it, and then
+    the cell holding the value that would bring that line's sum closest to the magic number,
+    give or take spread. A share of 1 - guided moves stays uniform so the search can
+    still leave the neighbourhood of the worst lines. The line ranking is redone at most
+    every refresh guided proposals, and only when the state has changed since the last one.
+    """
+
+    def __init__(self, guided=0.5, top_lines=16, spread=5, refresh=4):
+        if not 0.0 <= guided <= 1.0:
+            raise ValueError("guided must be between 0 and 1.")
+        self.guided = guided
+        self.top_lines = top_lines
+        self.spread = spread
+        self.refresh = refresh
+        self.countdown = 0
+        self.ranked_hash = None
+        self.worst_lines = []
+        self.guided_moves = 0
+
+    def rank_lines(self, magic_cube):
+        """Re-rank the lines by their current |sum - magic_number|, worst first."""
+        magic_number = magic_cube.magic_number
+        deviations = [abs(line_sum - magic_number) for line_sum in magic_cube.line_sums]
+        ranked = sorted(range(len(deviations)), key=deviations.__getitem__, reverse=True)
+        # Lines already on target cannot be improved by a guided move
+        self.worst_lines = [line for line in ranked[:self.top_lines] if deviations[line]]
+        self.countdown = self.refresh
+        self.ranked_hash = magic_cube.state_hash
+
+    def propose(self, magic_cube):
+        if random.random() >= self.guided:
+            return magic_cube.random_move()
+        self.countdown -= 1
+        # Rejected moves leave the state, and so the ranking, unchanged
+        if self.countdown <= 0 and magic_cube.state_hash != self.ranked_hash:
+            self.rank_lines(magic_cube)
+        if not self.worst_lines:
+            return magic_cube.random_move()
+
+        line = random.choice(self.worst_lines)
+        i = random.choice(magic_cube.lines[line])
+        cells = magic_cube.cells
+        # Replacing cells[i] by this value would put the line exactly on the magic number
+        target = cells[i] - (magic_cube.line_sums[line] - magic_cube.magic_number)
+        target += random.randint(-self.spread, self.spread)
+        target = min(max(target, 1), len(cells))
+        # The cube keeps the inverse of its cell buffer, so finding the value's cell is O(1)
+        j = magic_cube.positions[target]
+        if j == i:
+            return magic_cube.random_move()
+        self.guided_moves += 1
+        return i, j
+
+
+def make_moves(moves=None):
+    """Return a move generator: uniform for None or 0, GuidedMoves for a guided share, or the object itself."""
+    if moves is None:
+        return RandomMoves()
+    if isinstance(moves, (int, float)):
+        return GuidedMoves(guided=moves) if moves > 0 else RandomMoves()
+    return moves
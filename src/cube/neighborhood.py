@@ -0,0 +1,199 @@
+import math
+import numpy as np
+
+class NeighborhoodEvaluator:
+    """Score every pairwise swap of a MagicCube at once with NumPy array operations."""
+
+    _cache = {}
+
+    # Pairs processed at a time while building the tables, which bounds the scratch memory
+    BUILD_CHUNK = 65536
+
+    def __init__(self, magic_cube):
+        self.size = magic_cube.size
+        self.magic_number = magic_cube.magic_number
+        self.n_cells = self.size ** 3
+        line_index = magic_cube.line_index
+        n_lines = line_index.n_lines
+
+        # Pairs in the same order as itertools.combinations over the flat cells
+        self.first, self.second = np.triu_indices(self.n_cells, k=1)
+        self.n_pairs = n_pairs = len(self.first)
+
+        # Swapping first and second adds (second - first) to the sum of each line through
+        # first only (sign +1) and subtracts it from each line through second only (sign -1).
+        # Those lines are read from the per-cell line lists, padded with a dummy line
+        # (index n_lines, sign 0) to a common width, and stored as width x pairs so every
+        # step works on contiguous rows. Lines through both cells cancel out.
+        cell_lines = line_index.cell_line_matrix()
+        per_cell = cell_lines.shape[1]
+        candidate_lines = np.empty((n_pairs, 2 * per_cell), dtype=np.int32)
+        candidate_signs = np.empty((n_pairs, 2 * per_cell), dtype=np.int8)
+        for start in range(0, n_pairs, self.BUILD_CHUNK):
+            chunk = slice(start, start + self.BUILD_CHUNK)
+            lines1 = cell_lines[self.first[chunk]]
+            lines2 = cell_lines[self.second[chunk]]
+            shared = lines1[:, :, None] == lines2[:, None, :]
+            lines1 = np.where(shared.any(axis=2), n_lines, lines1)
+            lines2 = np.where(shared.any(axis=1), n_lines, lines2)
+            chunk_lines = np.concatenate((lines1, lines2), axis=1)
+            chunk_signs = np.concatenate(((lines1 != n_lines).astype(np.int8),
+                                          -(lines2 != n_lines).astype(np.int8)), axis=1)
+            # Move the real lines of every pair to the front
+            order = np.argsort(chunk_signs == 0, axis=1, kind='stable')
+            candidate_lines[chunk] = np.take_along_axis(chunk_lines, order, axis=1)
+            candidate_signs[chunk] = np.take_along_axis(chunk_signs, order, axis=1)
+        # Cut the padding every pair has
+        width = int(np.count_nonzero(candidate_signs, axis=1).max())
+        self.pair_lines = np.ascontiguousarray(candidate_lines[:, :width].T)
+        self.pair_signs = np.ascontiguousarray(candidate_signs[:, :width].T)
+        del candidate_lines, candidate_signs
+
+        # The same (pair, sign) terms grouped by line, so a change in one line sum can be
+        # pushed to exactly the swaps that read it
+        slots, pairs = np.nonzero(self.pair_signs)
+        lines = self.pair_lines[slots, pairs]
+        order = np.argsort(lines, kind='stable')
+        bounds = np.searchsorted(lines[order], np.arange(n_lines + 1))
+        term_pairs = pairs[order]
+        term_signs = self.pair_signs[slots, pairs][order].astype(np.int32)
+        self.line_pairs = [term_pairs[bounds[line]:bounds[line + 1]] for line in range(n_lines)]
+        self.line_signs = [term_signs[bounds[line]:bounds[line + 1]] for line in range(n_lines)]
+
+        # Pair indices involving each cell: pairs (cell, later) are contiguous, pairs (earlier, cell)
+        # sit at a fixed offset in each earlier cell's run
+        n = self.n_cells
+        run_starts = np.arange(n) * n - np.arange(n) * (np.arange(n) + 1) // 2
+        self.cell_pairs = [np.concatenate((np.arange(run_starts[cell], run_starts[cell] + n - cell - 1),
+                                           run_starts[:cell] + cell - np.arange(cell) - 1))
+                           for cell in range(n)]
+
+    @classmethod
+    def for_cube(cls, magic_cube):
+        """Return the evaluator for the cube's size, building it on first use."""
+        evaluator = cls._cache.get(magic_cube.size)
+        if evaluator is None:
+            evaluator = cls._cache[magic_cube.size] = cls(magic_cube)
+        return evaluator
+
+    def deltas(self, magic_cube, pairs=None):
+        """Return the objective change of every swap, or of the given pair indices only."""
+        first, second = self.first, self.second
+        pair_lines, pair_signs = self.pair_lines, self.pair_signs
+        if pairs is not None:
+            first, second = first[pairs], second[pairs]
+            pair_lines, pair_signs = pair_lines[:, pairs], pair_signs[:, pairs]
+
+        cells = np.frombuffer(magic_cube.cells, dtype=np.uint16).astype(np.int32)
+        # Offset of each line sum from the magic number; the dummy line is always on target
+        offsets = np.array(magic_cube.line_sums, dtype=np.int32) - self.magic_number
+        offsets = np.append(offsets, 0)
+
+        current = offsets[pair_lines]
+        swapped = pair_signs * (cells[second] - cells[first])
+        swapped += current
+        np.abs(swapped, out=swapped)
+        np.abs(current, out=current)
+        swapped -= current
+        return swapped.sum(axis=0)
+
+    def swap_positions(self, pair):
+        """Convert a pair index into the (pos1, pos2) positions of its two cells."""
+        n = self.size
+        first = int(self.first[pair])
+        second = int(self.second[pair])
+        return ((first // (n * n), first // n % n, first % n),
+                (second // (n * n), second // n % n, second % n))
+
+    def best_swap(self, magic_cube):
+        """Return the swap with the lowest resulting objective and its delta."""
+        deltas = self.deltas(magic_cube)
+        pair = int(np.argmin(deltas))
+        return self.swap_positions(pair), int(deltas[pair])
+
+    def best_swaps(self, magic_cube):
+        """Return every swap tied for the lowest resulting objective and their shared delta."""
+        deltas = self.deltas(magic_cube)
+        best_delta = deltas.min()
+        pairs = np.flatnonzero(deltas == best_delta)
+        return [self.swap_positions(pair) for pair in pairs], int(best_delta)
+
+    def apply_swap(self, magic_cube, pos1, pos2):
+        """Apply a swap to the cube. The evaluator keeps no state of its own to update."""
+        return magic_cube.apply_swap(pos1, pos2)
+
+
+class SwapDeltaTable:
+    """Maintained table of swap deltas with a block-minimum index for cheap best-swap queries."""
+
+    def __init__(self, magic_cube):
+        self.magic_cube = magic_cube
+        self.evaluator = NeighborhoodEvaluator.for_cube(magic_cube)
+        n_pairs = len(self.evaluator.first)
+
+        # Deltas are laid out as blocks of block_size pairs; the padding never wins a min
+        self.block_size = math.isqrt(n_pairs)
+        n_blocks = -(-n_pairs // self.block_size)
+        self.table = np.full((n_blocks, self.block_size), np.iinfo(np.int32).max, dtype=np.int32)
+        self.deltas = self.table.reshape(-1)[:n_pairs]
+        self.touched_blocks = np.zeros(n_blocks, dtype=bool)
+        self.rebuild()
+
+    def rebuild(self):
+        """Score every swap from scratch and rebuild the block minima."""
+        self.deltas[:] = self.evaluator.deltas(self.magic_cube)
+        self.block_min = self.table.min(axis=1)
+
+    def best_swap(self, magic_cube):
+        """Return the swap with the lowest resulting objective and its delta."""
+        # The first block holding the minimum, then its first pair, matches a full scan's tie-breaking
+        block = int(np.argmin(self.block_min))
+        offset = int(np.argmin(self.table[block]))
+        return self.evaluator.swap_positions(block * self.block_size + offset), int(self.block_min[block])
+
+    def best_swaps(self, magic_cube):
+        """Return every swap tied for the lowest resulting objective and their shared delta."""
+        best_delta = self.block_min.min()
+        blocks = np.flatnonzero(self.block_min == best_delta)
+        rows, offsets = np.nonzero(self.table[blocks] == best_delta)
+        pairs = blocks[rows] * self.block_size + offsets
+        return [self.evaluator.swap_positions(pair) for pair in pairs], int(best_delta)
+
+    def apply_swap(self, magic_cube, pos1, pos2):
+        """Apply a swap to the cube and rescore only the swaps whose delta it can change."""
+        cube = self.magic_cube
+        evaluator = self.evaluator
+        cell1 = cube.index(pos1)
+        cell2 = cube.index(pos2)
+        if cube.cells[cell1] == cube.cells[cell2]:
+            return 0
+
+        # Only lines through exactly one of the two cells change their sum
+        changed = sorted(set(cube.cell_lines[cell1]).symmetric_difference(cube.cell_lines[cell2]))
+        old_offsets = np.array([cube.line_sums[line] for line in changed], dtype=np.int32) - cube.magic_number
+        delta = cube.apply_swap(pos1, pos2)
+        new_offsets = np.array([cube.line_sums[line] for line in changed], dtype=np.int32) - cube.magic_number
+
+        # Swaps that read a changed line get the difference of that line's term added
+        pairs = np.concatenate([evaluator.line_pairs[line] for line in changed])
+        signs = np.concatenate([evaluator.line_signs[line] for line in changed])
+        counts = [len(evaluator.line_pairs[line]) for line in changed]
+        old_offsets = np.repeat(old_offsets, counts)
+        new_offsets = np.repeat(new_offsets, counts)
+        cells = np.frombuffer(cube.cells, dtype=np.uint16).astype(np.int32)
+        shift = signs * (cells[evaluator.second[pairs]] - cells[evaluator.first[pairs]])
+        terms = (np.abs(new_offsets + shift) - np.abs(new_offsets)
+                 - np.abs(old_offsets + shift) + np.abs(old_offsets))
+        np.add.at(self.deltas, pairs, terms)
+
+        # Swaps involving the moved cells see new values too and are rescored in full
+        direct = np.concatenate((evaluator.cell_pairs[cell1], evaluator.cell_pairs[cell2]))
+        self.deltas[direct] = evaluator.deltas(cube, direct)
+
+        touched = self.touched_blocks
+        touched[:] = False
+        touched[pairs // self.block_size] = True
+        touched[direct // self.block_size] = True
+        blocks = np.flatnonzero(touched)
+        self.block_min[blocks] = self.table[blocks].min(axis=1)
+        return delta
@@ -0,0 +1,89 @@
+from array import array
+from itertools import permutations, product
+import numpy as np
+from cube.zobrist import ZobristTable
+
+class SymmetryTable:
+    """The 96 objective-preserving maps of a cube size, as precomputed permutation tables.
+
+    The 48 rotations and reflections map rows, columns, pillars and both kinds of diagonal
+    onto lines of the same set, and the complement v -> n^3 + 1 - v turns every line's
+    deviation from the magic number into its negative. All 96 combinations therefore leave
+    the objective unchanged. canonical() picks the lexicographically smallest image of a
+    state and canonical_hash() is its Zobrist hash, so equivalent states hash equally.
+    """
+
+    _cache = {}
+
+    def __init__(self, size):
+        self.size = size
+        self.n_cells = size ** 3
+        n = size
+        coordinates = np.indices((n, n, n)).reshape(3, -1)
+        perms = []
+        for axes in permutations(range(3)):
+            for flips in product((False, True), repeat=3):
+                moved = coordinates[list(axes)]
+                moved = np.where(np.array(flips)[:, None], n - 1 - moved, moved)
+                target = (moved[0] * n + moved[1]) * n + moved[2]
+                # Cell target of the image takes the value of cell source of the original
+                perm = np.empty(self.n_cells, dtype=np.intp)
+                perm[target] = np.arange(self.n_cells)
+                perms.append(perm)
+        self.perms = np.array(perms)
+        # Image k < 48 applies perms[k]; image 48 + k also complements the values
+        self.image_perms = np.concatenate((self.perms, self.perms))
+        self.image_complement = np.repeat([False, True], len(perms))
+        self.zobrist = ZobristTable.for_size(size)
+        # The same keys as a NumPy array, so a whole population is hashed in one pass
+        self.keys = np.frombuffer(self.zobrist.keys, dtype=np.uint64)
+        self.key_rows = np.arange(self.n_cells) * self.zobrist.stride
+
+    @classmethod
+    def for_size(cls, size):
+        """Return the shared table for a cube size, building it on first use."""
+        table = cls._cache.get(size)
+        if table is None:
+            table = cls._cache[size] = cls(size)
+        return table
+
+    def image(self, cells, k):
+        """Equivalent state number k of 96 of a flat cell buffer, as a NumPy array."""
+        values = np.asarray(cells)[self.image_perms[k]].astype(np.int32)
+        return self.n_cells + 1 - values if self.image_complement[k] else values
+
+    def canonical_images(self, population):
+        """Index of the lexicographically smallest image of every row of a (count x n^3) state matrix."""
+        population = np.asarray(population)
+        rows = np.arange(len(population))[:, None]
+        tied = np.ones((len(population), len(self.image_perms)), dtype=bool)
+        # Compare the images column by column, keeping only those tied for the smallest value;
+        # values in a state are distinct, so a couple of columns nearly always settle every row
+        for column in range(self.n_cells):
+            values = population[rows, self.image_perms[:, column]].astype(np.int32)
+            values = np.where(self.image_complement, self.n_cells + 1 - values, values)
+            values[~tied] = self.n_cells + 1
+            tied &= values == values.min(axis=1, keepdims=True)
+            if (tied.sum(axis=1) == 1).all():
+                break
+        return tied.argmax(axis=1)
+
+    def canonical_population(self, population):
+        """The canonical state of every row of a (count x n^3) state matrix, as a matrix."""
+        population = np.asarray(population)
+        images = self.canonical_images(population)
+        canonical = np.take_along_axis(population, self.image_perms[images], axis=1).astype(np.int32)
+        return np.where(self.image_complement[images][:, None], self.n_cells + 1 - canonical, canonical)
+
+    def canonical(self, cells):
+        """The lexicographically smallest equivalent state, as a cell buffer like MagicCube.snapshot()."""
+        return array('H', self.canonical_population(np.asarray(cells)[None, :])[0].tolist())
+
+    def canonical_hashes(self, population):
+        """Zobrist hash of the canonical state of every row, as a uint64 vector."""
+        canonical = self.canonical_population(population)
+        return np.bitwise_xor.reduce(self.keys[self.key_rows + canonical], axis=1)
+
+    def canonical_hash(self, cells):
+        """Zobrist hash of the canonical state, shared by a state and all of its 95 equivalents."""
+        return int(self.canonical_hashes(np.asarray(cells)[None, :])[0])
@@ -0,0 +1,239 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from cube.cube import MagicCube
+from main import ALGORITHMS, CLI_COMMANDS, RANDOM_RESTART_HC
+from reporting.progress import SilentProgress
+
+COLUMNS = ['trial', 'algorithm', 'size', 'seed', 'params', 'final_objective', 'iterations', 'evaluations', 'duration',
+           'evaluations_per_second', 'reached_target', 'time_to_target', 'error']
+SUMMARY_COLUMNS = ['algorithm', 'size', 'params', 'trials', 'failures', 'success_rate',
+                   'objective_mean', 'objective_p10', 'objective_p50', 'objective_p90',
+                   'iterations_p50', 'evaluations_per_second_p50', 'time_to_target_p50', 'time_to_target_p90']
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+def expand_grid(grid):
+    """Yield (algorithm, params, size, seed) for every combination in a grid definition.
+
+    A grid is a dict such as
+    {'sizes': [3, 5], 'seeds': 10, 'algorithms': {'annealing': {'initial_temp': [100, 1000]}}},
+    where algorithms are main.py subcommands, a list is an axis to sweep and any other value
+    is fixed. 'seeds' is either a list of seeds or a count of seeds starting at 0.
+    """
+    seeds = grid.get('seeds', 1)
+    seeds = list(range(seeds)) if isinstance(seeds, int) else seeds
+    for algorithm, parameters in grid['algorithms'].items():
+        if algorithm not in CLI_COMMANDS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'. Choose from: {', '.join(CLI_COMMANDS)}.")
+        names = list(parameters or {})
+        axes = [value if isinstance(value, list) else [value] for value in (parameters or {}).values()]
+        for values in itertools.product(*axes):
+            for size in grid.get('sizes', [5]):
+                for seed in seeds:
+                    yield algorithm, dict(zip(names, values)), size, seed
+
+def run_trial(trial, algorithm, params, size, seed, target, time_limit):
+    """Run one algorithm on a fresh seeded cube; return its CSV row of objective, cost and target outcome."""
+    algo = CLI_COMMANDS[algorithm][0]
+    run_params = dict(params)
+    if time_limit is not None:
+        run_params['time_limit'] = time_limit
+    # Every search stops as soon as its best objective reaches the target
+    run_params.setdefault('target_value', target)
+    if algo == RANDOM_RESTART_HC:
+        run_params.setdefault('seed', seed)
+
+    random.seed(seed)
+    search = ALGORITHMS[algo][1](MagicCube(size), progress=SilentProgress(), **run_params)
+    search.run()
+    result = search.result()
+
+    # Candidate states scored: one per swap tried, a whole neighbourhood per steepest step, an individual per GA score
+    evaluations = result['evaluations']
+    reached = result['final_objective'] is not None and result['final_objective'] <= target
+    return {
+        'trial': trial,
+        'algorithm': algorithm,
+        'size': size,
+        'seed': seed,
+        'params': json.dumps(params, sort_keys=True),
+        'final_objective': result['final_objective'],
+        'iterations': result['iterations'],
+        'evaluations': evaluations,
+        'duration': result['duration'],
+        'evaluations_per_second': evaluations / result['duration'] if result['duration'] else None,
+        'reached_target': int(reached),
+        # Searches stop as soon as they reach the target, so the run length is the time to target
+        'time_to_target': result['duration'] if reached else None,
+        'error': None,
+    }
+
+def failed_trial(trial, algorithm, params, size, seed, target, time_limit, error):
+    """The results row of a trial that raised; it counts as unsolved and keeps the error message."""
+    row = dict.fromkeys(COLUMNS)
+    row.update(trial=trial, algorithm=algorithm, size=size, seed=seed, params=json.dumps(params, sort_keys=True),
+               reached_target=0, error=f"{type(error).__name__}: {error}")
+    return row
+
+def iter_trials(trials, workers):
+    """Run the trials and yield each row as soon as its trial finishes.
+
+    A trial that raises, for instance over a parameter its algorithm lacks, yields a failed
+    row instead of ending the grid.
+    """
+    if workers <= 1:
+        for trial in trials:
+            try:
+                yield run_trial(*trial)
+            except Exception as error:
+                yield failed_trial(*trial, error)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_trial, *trial): trial for trial in trials}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as error:
+                yield failed_trial(*futures[future], error)
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+def summarize(rows):
+    """One summary row per algorithm, size and parameter set, with percentiles over its seeds."""
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['algorithm'], row['size'], row['params']), []).append(row)
+    summary = []
+    for (algorithm, size, params), group in sorted(groups.items()):
+        objectives = [row['final_objective'] for row in group if row['final_objective'] is not None]
+        rates = [row['evaluations_per_second'] for row in group if row['evaluations_per_second'] is not None]
+        times = [row['time_to_target'] for row in group if row['time_to_target'] is not None]
+        summary.append({
+            'algorithm': algorithm,
+            'size': size,
+            'params': params,
+            'trials': len(group),
+            'failures': sum(row['error'] is not None for row in group),
+            'success_rate': sum(row['reached_target'] for row in group) / len(group),
+            'objective_mean': float(np.mean(objectives)) if objectives else None,
+            'objective_p10': percentile(objectives, 10),
+            'objective_p50': percentile(objectives, 50),
+            'objective_p90': percentile(objectives, 90),
+            'iterations_p50': percentile([row['iterations'] for row in group if row['iterations'] is not None], 50),
+            'evaluations_per_second_p50': percentile(rates, 50),
+            'time_to_target_p50': percentile(times, 50),
+            'time_to_target_p90': percentile(times, 90),
+        })
+    return summary
+
+class CsvResults:
+    """Trials go to the CSV file as they finish; the summary to <name>_summary.csv."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=COLUMNS)
+        self.writer.writeheader()
+
+    def add(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def finish(self, summary):
+        self.file.close()
+        stem, extension = os.path.splitext(self.path)
+        with open(f"{stem}_summary{extension}", 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=SUMMARY_COLUMNS)
+            writer.writeheader()
+            writer.writerows(summary)
+
+class SqliteResults:
+    """Trials go to a 'trials' table as they finish; the summary replaces the 'summary' table."""
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("DROP TABLE IF EXISTS trials")
+        self.connection.execute(f"CREATE TABLE trials ({', '.join(COLUMNS)})")
+
+    def add(self, row):
+        placeholders = ', '.join('?' * len(COLUMNS))
+        self.connection.execute(f"INSERT INTO trials VALUES ({placeholders})", [row[column] for column in COLUMNS])
+        self.connection.commit()
+
+    def finish(self, summary):
+        self.connection.execute("DROP TABLE IF EXISTS summary")
+        self.connection.execute(f"CREATE TABLE summary ({', '.join(SUMMARY_COLUMNS)})")
+        placeholders = ', '.join('?' * len(SUMMARY_COLUMNS))
+        self.connection.executemany(f"INSERT INTO summary VALUES ({placeholders})",
+                                    [[row[column] for column in SUMMARY_COLUMNS] for row in summary])
+        self.connection.commit()
+        self.connection.close()
+
+def open_results(path):
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SqliteResults(path)
+    return CsvResults(path)
+
+def print_summary(summary, stream=sys.stdout):
+    def cell(value):
+        if value is None:
+            return '-'
+        return f"{value:.4g}" if isinstance(value, float) else str(value)
+
+    print(f"{'Algorithm':<16} {'Size':>4} {'Trials':>6} {'Failed':>6} {'Solved':>7} {'Obj p50':>9} {'Obj p90':>9} "
+          f"{'Evals/s p50':>12} {'TTT p50':>9}  Params", file=stream)
+    for row in summary:
+        print(f"{row['algorithm']:<16} {row['size']:>4} {row['trials']:>6} {row['failures']:>6} "
+              f"{row['success_rate']:>7.0%} "
+              f"{cell(row['objective_p50']):>9} {cell(row['objective_p90']):>9} "
+              f"{cell(row['evaluations_per_second_p50']):>12} {cell(row['time_to_target_p50']):>9}  {row['params']}",
+              file=stream)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run a grid of algorithms, parameters, cube sizes and seeds and tabulate the results.")
+    parser.add_argument('grid', help="JSON grid file, see expand_grid")
+    parser.add_argument('--output', default='experiment.csv',
+                        help="Results file; .db/.sqlite/.sqlite3 writes SQLite, anything else CSV (default: experiment.csv)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes (default: CPU count)")
+    parser.add_argument('--target', type=int, default=None,
+                        help="Objective value that counts as solved (default: the grid's 'target', else 0)")
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help="Seconds per trial (default: the grid's 'time_limit', else none)")
+    args = parser.parse_args(argv)
+
+    with open(args.grid) as file:
+        grid = json.load(file)
+    target = args.target if args.target is not None else grid.get('target', 0)
+    time_limit = args.time_limit if args.time_limit is not None else grid.get('time_limit')
+    trials = [(trial, *combination, target, time_limit) for trial, combination in enumerate(expand_grid(grid))]
+
+    print(f"Running {len(trials)} trials on {args.workers} worker(s)...", file=sys.stderr)
+    results = open_results(args.output)
+    rows = []
+    start = time.time()
+    try:
+        for row in iter_trials(trials, args.workers):
+            rows.append(row)
+            results.add(row)
+            outcome = f"objective={row['final_objective']}" if row['error'] is None else f"failed: {row['error']}"
+            print(f"[{len(rows)}/{len(trials)}] {row['algorithm']} size={row['size']} seed={row['seed']} {outcome}",
+                  file=sys.stderr)
+    finally:
+        # The trials finished so far are summarized even when the grid is interrupted
+        summary = summarize(rows)
+        results.finish(summary)
+    print(f"Finished in {time.time() - start:.1f} seconds; results in {args.output}\n", file=sys.stderr)
+    print_summary(summary)
+
+if __name__ == "__main__":
+    main()
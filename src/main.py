@@ -1,11 +1,24 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+import algorithms.cooling
 import algorithms.genetic_algorithm
+import algorithms.great_deluge
 import algorithms.hill_climbing_with_sideways_move
+import algorithms.late_acceptance_hill_climbing
+import algorithms.memetic_algorithm
 import algorithms.random_restart_hill_climbing
 import algorithms.simulated_annealing
 import algorithms.steepest_ascent_hill_climbing
 import algorithms.stochastic_hill_climbing
+import algorithms.tabu_search
+from algorithms.checkpoint import Checkpointer
 from cube.cube import MagicCube
-import copy
+from reporting.progress import ConsoleProgress, JsonLinesProgress, SilentProgress
 
 # Algorithm selection constants
 STEEPEST_ASCENT_HC = 1
@@ -14,6 +27,111 @@ SIDEWAYS_MOVE_HC = 3
 RANDOM_RESTART_HC = 4
 SIMULATED_ANNEALING = 5
 GENETIC_ALGORITHM = 6
+TABU_SEARCH = 7
+MEMETIC_ALGORITHM = 8
+LATE_ACCEPTANCE_HC = 9
+GREAT_DELUGE = 10
+
+# Menu name and class of each algorithm, keyed by its selection constant
+ALGORITHMS = {
+    STEEPEST_ASCENT_HC: ('Steepest Ascent HC', algorithms.steepest_ascent_hill_climbing.SteepestAscentHillClimbing),
+    STOCHASTIC_HC: ('Stochastic HC', algorithms.stochastic_hill_climbing.StochasticHillClimbing),
+    SIDEWAYS_MOVE_HC: ('HC with Sideways Move', algorithms.hill_climbing_with_sideways_move.HillClimbingWithSidewaysMove),
+    RANDOM_RESTART_HC: ('Random Restart HC', algorithms.random_restart_hill_climbing.RandomRestartHillClimbing),
+    SIMULATED_ANNEALING: ('Simulated Annealing', algorithms.simulated_annealing.SimulatedAnnealing),
+    GENETIC_ALGORITHM: ('Genetic Algorithm', algorithms.genetic_algorithm.GeneticAlgorithm),
+    TABU_SEARCH: ('Tabu Search', algorithms.tabu_search.TabuSearch),
+    MEMETIC_ALGORITHM: ('Memetic Algorithm', algorithms.memetic_algorithm.MemeticAlgorithm),
+    LATE_ACCEPTANCE_HC: ('Late Acceptance HC', algorithms.late_acceptance_hill_climbing.LateAcceptanceHillClimbing),
+    GREAT_DELUGE: ('Great Deluge', algorithms.great_deluge.GreatDeluge),
+}
+
+# Batch subcommands: the algorithm they run and the parameters get_algorithm_parameters would ask for
+CLI_COMMANDS = {
+    'steepest': (STEEPEST_ASCENT_HC, [
+        ('--incremental', dict(action='store_true', help="Maintain the swap-delta table between iterations")),
+    ]),
+    'stochastic': (STOCHASTIC_HC, [
+        ('--max-trials', dict(type=int, default=10000, help="Max trials (default: 10000)")),
+        ('--guided', dict(type=float, default=None, dest='moves',
+                          help="Share of moves aimed at the worst lines, 0 to 1 (default: uniform moves)")),
+    ]),
+    'sideways': (SIDEWAYS_MOVE_HC, [
+        ('--max-sideways', dict(type=int, default=100, help="Max sideways moves (default: 100)")),
+        ('--incremental', dict(action='store_true', help="Maintain the swap-delta table between iterations")),
+    ]),
+    'random-restart': (RANDOM_RESTART_HC, [
+        ('--max-restarts', dict(type=int, default=5, help="Max restarts (default: 5)")),
+        ('--workers', dict(type=int, default=1, help="Worker processes (default: 1)")),
+        ('--no-deduplicate', dict(action='store_false', dest='deduplicate',
+                                  help="Do not check local optima for equivalence under the cube's symmetries")),
+    ]),
+    'annealing': (SIMULATED_ANNEALING, [
+        ('--initial-temp', dict(type=float, default=1000, help="Initial temperature (default: 1000)")),
+        ('--cooling-rate', dict(type=float, default=0.95, help="Cooling rate (default: 0.95)")),
+        ('--schedule', dict(choices=list(algorithms.cooling.SCHEDULES), default='geometric',
+                            help="Cooling schedule (default: geometric); logarithmic and lundy-mees need "
+                                 "--budget-seconds or --max-evaluations")),
+        ('--budget-seconds', dict(type=float, default=None,
+                                  help="Stretch the schedule over this many seconds per run")),
+        ('--max-evaluations', dict(type=int, default=None,
+                                   help="Stretch the schedule over this many moves per run")),
+        ('--final-temp', dict(type=float, default=None,
+                              help="Temperature at the end of the schedule (default: 1 with a budget, else 1e-10)")),
+        ('--guided', dict(type=float, default=None, dest='moves',
+                          help="Share of moves aimed at the worst lines, 0 to 1 (default: uniform moves)")),
+    ]),
+    'genetic': (GENETIC_ALGORITHM, [
+        ('--population-size', dict(type=int, default=50, help="Population size (default: 50)")),
+        ('--mutation-rate', dict(type=float, default=0.01, help="Mutation rate (default: 0.01)")),
+        ('--iterations', dict(type=int, default=100, dest='amount_iteration',
+                              help="Amount of iterations (default: 100)")),
+        ('--deduplicate', dict(action='store_true',
+                               help="Mutate children equivalent under the cube's symmetries (slower generations)")),
+    ]),
+    'tabu': (TABU_SEARCH, [
+        ('--max-iterations', dict(type=int, default=1000, help="Max iterations (default: 1000)")),
+        ('--tabu-tenure', dict(type=int, default=10, help="Iterations a moved cell stays tabu (default: 10)")),
+        ('--candidates', dict(type=int, default=64, help="Best swaps examined per iteration (default: 64)")),
+        ('--state-memory', dict(type=int, default=1000,
+                                help="Recent states remembered to avoid revisits (default: 1000)")),
+        ('--full-scan', dict(action='store_false', dest='incremental',
+                             help="Rescore every swap each iteration instead of maintaining the delta table")),
+    ]),
+    'memetic': (MEMETIC_ALGORITHM, [
+        ('--population-size', dict(type=int, default=10, help="Population size (default: 10)")),
+        ('--mutation-rate', dict(type=float, default=0.1, help="Mutation rate (default: 0.1)")),
+        ('--iterations', dict(type=int, default=100, dest='amount_iteration',
+                              help="Amount of iterations (default: 100)")),
+        ('--refine-steps', dict(type=int, default=2000,
+                                help="Local search swap proposals per child (default: 2000)")),
+        ('--workers', dict(type=int, default=1, help="Worker processes for the refinement (default: 1)")),
+        ('--no-deduplicate', dict(action='store_false', dest='deduplicate',
+                                  help="Keep individuals equivalent under the cube's symmetries")),
+    ]),
+    'late-acceptance': (LATE_ACCEPTANCE_HC, [
+        ('--history-length', dict(type=int, default=200,
+                                  help="Iterations between a step and the score it is compared with (default: 200)")),
+        ('--max-evaluations', dict(type=int, default=1000000, help="Max moves scored (default: 1000000)")),
+        ('--max-idle', dict(type=int, default=None, help="Stop after this many moves without a new best")),
+        ('--guided', dict(type=float, default=None, dest='moves',
+                          help="Share of moves aimed at the worst lines, 0 to 1 (default: uniform moves)")),
+    ]),
+    'great-deluge': (GREAT_DELUGE, [
+        ('--max-evaluations', dict(type=int, default=1000000,
+                                   help="Moves over which the level falls (default: 1000000)")),
+        ('--budget-seconds', dict(type=float, default=None,
+                                  help="Seconds over which the level falls; the earlier budget wins")),
+        ('--initial-level', dict(type=float, default=None,
+                                 help="Starting water level (default: the starting objective)")),
+        ('--final-level', dict(type=float, default=0, help="Water level at the end of the budget (default: 0)")),
+        ('--guided', dict(type=float, default=None, dest='moves',
+                          help="Share of moves aimed at the worst lines, 0 to 1 (default: uniform moves)")),
+    ]),
+}
+
+# Algorithms whose runs can be checkpointed and resumed
+CHECKPOINTED = (RANDOM_RESTART_HC, SIMULATED_ANNEALING, GENETIC_ALGORITHM, MEMETIC_ALGORITHM)
 
 # Global variable to control the selected algorithm
 SEARCH_ALGO = STEEPEST_ASCENT_HC  # Default to Steepest Ascent HC
@@ -21,19 +139,18 @@ SEARCH_ALGO = STEEPEST_ASCENT_HC  # Default to Steepest Ascent HC
 # Select the search algorithm based on user input
 def select_search_algo(value: int):
     global SEARCH_ALGO
-    if 1 <= value <= 6:
+    if value in ALGORITHMS:
         SEARCH_ALGO = value
-        algo_names = ['Steepest Ascent HC', 'Stochastic HC', 'HC with Sideways Move',
-                      'Random Restart HC', 'Simulated Annealing', 'Genetic Algorithm']
-        print(f"Selected search algorithm: {algo_names[SEARCH_ALGO - 1]}")
+        print(f"Selected search algorithm: {ALGORITHMS[SEARCH_ALGO][0]}")
     else:
-        raise ValueError("Invalid algorithm selection. Please choose a number between 1 and 6.")
+        raise ValueError(f"Invalid algorithm selection. Please choose a number between 1 and {len(ALGORITHMS)}.")
 
 # Get additional parameters for specific algorithms
 def get_algorithm_parameters():
     params = {}
     if SEARCH_ALGO == RANDOM_RESTART_HC:
         params['max_restarts'] = int(input("Enter max restarts for Random Restart Hill Climbing: "))
+        params['workers'] = int(input("Enter number of worker processes for Random Restart Hill Climbing: "))
     elif SEARCH_ALGO == SIDEWAYS_MOVE_HC:
         params['max_sideways'] = int(input("Enter max sideways moves for Hill Climbing with Sideways Move: "))
     elif SEARCH_ALGO == SIMULATED_ANNEALING:
@@ -45,31 +162,34 @@ def get_algorithm_parameters():
         params['amount_iteration'] = int(input("Enter amount of iterations for Genetic Algorithm: "))
     elif SEARCH_ALGO == STOCHASTIC_HC:
         params['max_trials'] = int(input("Enter max trials for Stochastic Hill Climbing: "))
+    elif SEARCH_ALGO == TABU_SEARCH:
+        params['max_iterations'] = int(input("Enter max iterations for Tabu Search: "))
+        params['tabu_tenure'] = int(input("Enter tabu tenure for Tabu Search (e.g., 10): "))
+    elif SEARCH_ALGO == MEMETIC_ALGORITHM:
+        params['population_size'] = int(input("Enter population size for Memetic Algorithm (e.g., 10): "))
+        params['mutation_rate'] = float(input("Enter mutation rate for Memetic Algorithm (e.g., 0.1): "))
+        params['amount_iteration'] = int(input("Enter amount of iterations for Memetic Algorithm: "))
+        params['refine_steps'] = int(input("Enter local search steps per child for Memetic Algorithm (e.g., 2000): "))
+        params['workers'] = int(input("Enter number of worker processes for Memetic Algorithm: "))
+    elif SEARCH_ALGO == LATE_ACCEPTANCE_HC:
+        params['history_length'] = int(input("Enter history length for Late Acceptance Hill Climbing (e.g., 200): "))
+        params['max_evaluations'] = int(input("Enter max evaluations for Late Acceptance Hill Climbing: "))
+    elif SEARCH_ALGO == GREAT_DELUGE:
+        params['max_evaluations'] = int(input("Enter max evaluations for Great Deluge: "))
     return params
 
 # Start the local search based on the selected algorithm
 def start_search(magic_cube, params):
     print("\nStarting Local Search...")
 
-    # Create a deep copy of the cube to ensure the search runs on a fresh copy
-    cube_copy = copy.deepcopy(magic_cube)
+    # Copy the cube to ensure the search runs on a fresh copy
+    cube_copy = magic_cube.copy()
     
     try:
         # Instantiate and run the selected search algorithm with parameters
-        if SEARCH_ALGO == STEEPEST_ASCENT_HC:
-            algorithm = algorithms.steepest_ascent_hill_climbing.SteepestAscentHillClimbing(cube_copy)
-        elif SEARCH_ALGO == STOCHASTIC_HC:
-            algorithm = algorithms.stochastic_hill_climbing.StochasticHillClimbing(cube_copy, **params)
-        elif SEARCH_ALGO == SIDEWAYS_MOVE_HC:
-            algorithm = algorithms.hill_climbing_with_sideways_move.HillClimbingWithSidewaysMove(cube_copy, **params)
-        elif SEARCH_ALGO == RANDOM_RESTART_HC:
-            algorithm = algorithms.random_restart_hill_climbing.RandomRestartHillClimbing(cube_copy, **params)
-        elif SEARCH_ALGO == SIMULATED_ANNEALING:
-            algorithm = algorithms.simulated_annealing.SimulatedAnnealing(cube_copy, **params)
-        elif SEARCH_ALGO == GENETIC_ALGORITHM:
-            algorithm = algorithms.genetic_algorithm.GeneticAlgorithm(cube_copy, **params)
-        else:
+        if SEARCH_ALGO not in ALGORITHMS:
             raise ValueError("Selected algorithm is not implemented.")
+        algorithm = ALGORITHMS[SEARCH_ALGO][1](cube_copy, **params)
         
         # Run the algorithm
         algorithm.run()
@@ -80,8 +200,136 @@ def start_search(magic_cube, params):
     except Exception as e:
         print(f"An error occurred during the search: {e}")
 
-# Main function to handle user input and algorithm initialization
-def main():
+# Build the argument parser for the non-interactive batch mode
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Run a Magic Cube search without prompts and write one JSON result per run. "
+                    "Start without arguments for the interactive menu.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command, (algo, options) in CLI_COMMANDS.items():
+        subparser = subparsers.add_parser(command, help=ALGORITHMS[algo][0])
+        subparser.add_argument('--size', type=int, default=5, help="Cube size (default: 5)")
+        subparser.add_argument('--seed', type=int, default=None, help="Base seed; run k uses seed + k")
+        subparser.add_argument('--runs', type=int, default=1, help="Number of independent runs (default: 1)")
+        subparser.add_argument('--time-budget', type=float, default=None,
+                               help="Wall-clock seconds shared by all runs; runs stop when it is spent")
+        subparser.add_argument('--output', default=None, help="JSON Lines output file (default: stdout)")
+        subparser.add_argument('--plot', action='store_true',
+                               help="Save each run's plot to src/data (headless; the report goes to stderr with --verbose)")
+        subparser.add_argument('--plot-data', action='store_true',
+                               help="Embed each run's plot data in its result for `python -m reporting.render`")
+        subparser.add_argument('--verbose', action='store_true', help="Echo algorithm progress to stderr")
+        subparser.add_argument('--progress-every', type=int, default=None,
+                               help="Report progress every N steps")
+        subparser.add_argument('--progress-seconds', type=float, default=None,
+                               help="Report progress at most every T seconds (default: 1 when reporting)")
+        subparser.add_argument('--progress-jsonl', default=None,
+                               help="Write progress events as JSON Lines to this file")
+        if algo in CHECKPOINTED:
+            subparser.add_argument('--checkpoint', default=None,
+                                   help="Checkpoint file; run k of several uses <checkpoint>.<k>")
+            subparser.add_argument('--checkpoint-every', type=int, default=None,
+                                   help="Checkpoint every N steps (generations, restarts)")
+            subparser.add_argument('--checkpoint-seconds', type=float, default=None,
+                                   help="Checkpoint every T seconds (default: 60)")
+            subparser.add_argument('--resume', action='store_true',
+                                   help="Continue from the checkpoints, skipping runs already in --output")
+        names = []
+        for flag, kwargs in options:
+            subparser.add_argument(flag, **kwargs)
+            names.append(kwargs.get('dest', flag.lstrip('-').replace('-', '_')))
+        subparser.set_defaults(algo=algo, param_names=names)
+    return parser
+
+# Pick the progress sink for a batch: silent unless a progress file or --verbose asks for one
+def build_progress(args):
+    seconds = args.progress_seconds
+    if seconds is None and args.progress_every is None:
+        seconds = 1.0
+    if args.progress_jsonl:
+        return JsonLinesProgress(args.progress_jsonl, every=args.progress_every, seconds=seconds)
+    if args.verbose:
+        return ConsoleProgress(every=args.progress_every, seconds=seconds, stream=sys.stderr)
+    return SilentProgress()
+
+# Run the batch described by the parsed arguments, writing one JSON line per finished run
+def run_batch(args):
+    algorithm_class = ALGORITHMS[args.algo][1]
+    params = {name: getattr(args, name) for name in args.param_names}
+    deadline = None if args.time_budget is None else time.time() + args.time_budget
+
+    checkpoint_path = getattr(args, 'checkpoint', None)
+    resume = getattr(args, 'resume', False)
+    # Runs already written by an interrupted batch are kept and not run again
+    finished_runs = set()
+    if resume and args.output and os.path.exists(args.output):
+        with open(args.output) as previous:
+            finished_runs = {json.loads(line)['run'] for line in previous if line.strip()}
+
+    output = open(args.output, 'a' if resume else 'w') if args.output else sys.stdout
+    progress = build_progress(args)
+    # Results own stdout, so reports either go to stderr or nowhere
+    echo = sys.stderr if args.verbose else open(os.devnull, 'w')
+    try:
+        for run in range(args.runs):
+            if run in finished_runs:
+                continue
+            run_params = dict(params)
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                run_params['time_limit'] = remaining
+
+            seed = None if args.seed is None else args.seed + run
+            if seed is not None:
+                random.seed(seed)
+            if args.algo == RANDOM_RESTART_HC:
+                run_params['seed'] = seed
+
+            if checkpoint_path:
+                path = checkpoint_path if args.runs == 1 else f"{checkpoint_path}.{run}"
+                run_params['checkpoint'] = Checkpointer(path, every=args.checkpoint_every,
+                                                        seconds=args.checkpoint_seconds)
+
+            progress.emit('run', run, seed=seed)
+            algorithm = algorithm_class(MagicCube(size=args.size), progress=progress, **run_params)
+            if checkpoint_path:
+                algorithm.run(resume=resume)
+            else:
+                algorithm.run()
+            if args.plot:
+                with contextlib.redirect_stdout(echo):
+                    algorithm.report(show=False)
+
+            record = {'run': run, 'seed': seed, 'size': args.size, 'params': params}
+            record.update(algorithm.result())
+            if args.plot_data:
+                record['plot'] = algorithm.plot_spec()
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+    finally:
+        progress.close()
+        if output is not sys.stdout:
+            output.close()
+        if echo is not sys.stderr:
+            echo.close()
+
+# Main function: batch mode when arguments are given, otherwise the interactive menu
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv:
+        parser = build_parser()
+        args = parser.parse_args(argv)
+        schedule = getattr(args, 'schedule', None)
+        # Refused up front: without a budget these schedules would anneal for practically ever
+        if (schedule is not None and algorithms.cooling.SCHEDULES[schedule].needs_budget
+                and args.budget_seconds is None and args.max_evaluations is None):
+            parser.error(f"--schedule {schedule} needs --budget-seconds or --max-evaluations")
+        run_batch(args)
+        return
+
     print("Welcome to the Magic Cube Solver")
     
     # Initialize Magic Cube
@@ -94,25 +342,21 @@ def main():
 
     while True:
         print("\nAvailable Algorithms:")
-        print("1: Steepest Ascent HC")
-        print("2: Stochastic HC")
-        print("3: HC with Sideways Move")
-        print("4: Random Restart HC")
-        print("5: Simulated Annealing")
-        print("6: Genetic Algorithm")
+        for value, (name, _) in ALGORITHMS.items():
+            print(f"{value}: {name}")
         print("0: Exit Program")
 
         # Get user input for algorithm selection
         while True:
             try:
-                choice = int(input("Select an algorithm (1-6, or 0 to exit): "))
+                choice = int(input(f"Select an algorithm (1-{len(ALGORITHMS)}, or 0 to exit): "))
                 if choice == 0:
                     print("Exiting the program. Goodbye!")
                     return  # Exit the program
                 select_search_algo(choice)
                 break
             except ValueError as e:
-                print(f"Error: {e}. Please enter a valid number between 0 and 6.")
+                print(f"Error: {e}. Please enter a valid number between 0 and {len(ALGORITHMS)}.")
 
         # Get additional parameters for the selected algorithm
         params = get_algorithm_parameters()
@@ -0,0 +1,132 @@
+import json
+import queue
+import sys
+import threading
+import time
+
+class ProgressSink:
+    """Receives progress events from a running search.
+
+    Searches ask due() once per step and only build an event when it returns True, so the
+    rate limit decides how much formatting a run pays for. Events are formatted and written
+    by a background thread, so emit() never waits on the output stream.
+    """
+
+    def __init__(self, every=None, seconds=None):
+        if every is not None and seconds is not None:
+            raise ValueError("Report either every N steps or every T seconds, not both.")
+        if every is not None and every < 1:
+            raise ValueError("every must be at least 1.")
+        self.every = every if seconds is None else None
+        self.seconds = seconds
+        self.countdown = 1
+        self.next_time = 0.0
+        self.start_time = time.monotonic()
+        self.queue = None
+        self.thread = None
+
+    def due(self):
+        """Return True when the next step should be reported."""
+        if self.seconds is not None:
+            now = time.monotonic()
+            if now < self.next_time:
+                return False
+            self.next_time = now + self.seconds
+            return True
+        self.countdown -= 1
+        if self.countdown > 0:
+            return False
+        self.countdown = self.every or 1
+        return True
+
+    def emit(self, event, step, **fields):
+        """Queue an event for writing. Call directly for events that must never be dropped."""
+        if self.thread is None:
+            self.queue = queue.Queue()
+            self.thread = threading.Thread(target=self._write_loop, daemon=True)
+            self.thread.start()
+        self.queue.put((event, step, time.monotonic() - self.start_time, fields))
+
+    def _write_loop(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is not None:
+                    self.write(*item)
+            finally:
+                self.queue.task_done()
+            if item is None:
+                return
+
+    def write(self, event, step, elapsed, fields):
+        """Format and write one event; runs on the writer thread."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Block until every queued event has been written."""
+        if self.queue is not None:
+            self.queue.join()
+
+    def close(self):
+        """Write any queued events and stop the writer thread."""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+            self.queue = None
+
+
+class SilentProgress(ProgressSink):
+    """Drops every event; nothing is ever formatted."""
+
+    def due(self):
+        return False
+
+    def emit(self, event, step, **fields):
+        pass
+
+
+class ConsoleProgress(ProgressSink):
+    """Human-readable lines, at most one every N steps or every T seconds."""
+
+    def __init__(self, every=None, seconds=None, stream=None):
+        super().__init__(every, seconds)
+        self.stream = stream
+
+    def write(self, event, step, elapsed, fields):
+        stream = self.stream if self.stream is not None else sys.stdout
+        values = ", ".join(f"{name.replace('_', ' ').title()} = {value:.4f}" if isinstance(value, float)
+                           else f"{name.replace('_', ' ').title()} = {value}"
+                           for name, value in fields.items())
+        stream.write(f"{event.replace('_', ' ').title()} {step}: {values}\n")
+        stream.flush()
+
+
+class JsonLinesProgress(ProgressSink):
+    """One JSON object per event, written to a path or an open text stream."""
+
+    def __init__(self, output, every=None, seconds=None):
+        super().__init__(every, seconds)
+        self.owns_stream = isinstance(output, str)
+        self.stream = open(output, 'w') if self.owns_stream else output
+
+    def write(self, event, step, elapsed, fields):
+        record = {'event': event, 'step': step, 'elapsed': round(elapsed, 6)}
+        record.update(fields)
+        self.stream.write(json.dumps(record) + "\n")
+
+    def flush(self):
+        super().flush()
+        self.stream.flush()
+
+    def close(self):
+        super().close()
+        if self.owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+def default_progress(progress):
+    """The sink an algorithm should use when the caller did not pass one."""
+    return ConsoleProgress(seconds=1.0) if progress is None else progress
@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+# Plots go next to the sources in src/data, wherever the solver is started from
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def has_display():
+    """Whether a GUI window could be opened; only X11/Wayland sessions can tell us they cannot."""
+    if not sys.platform.startswith('linux'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+def pyplot(headless=False):
+    """Import matplotlib.pyplot on first use, on the non-GUI Agg backend when headless."""
+    import matplotlib
+    # An explicit MPLBACKEND always wins
+    if headless and 'MPLBACKEND' not in os.environ:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def render_plot(spec, directory=DATA_DIR, show=None, timestamp=None):
+    """Draw a plot spec from an algorithm's plot_spec(), save it as PNG and return the path.
+
+    A spec is plain data so it can be stored with the run results and rendered later:
+    {'name', 'figsize', 'panels': [{'title', 'xlabel', 'ylabel', 'grid', 'legend', 'legend_title',
+    'lines': [{'x', 'y', 'label', 'fmt', 'color'}]}]}. show=None shows the window only when a
+    display is available.
+    """
+    if show is None:
+        show = has_display()
+    plt = pyplot(headless=not show)
+
+    figure = plt.figure(figsize=spec.get('figsize'))
+    panels = spec['panels']
+    for index, panel in enumerate(panels):
+        if len(panels) > 1:
+            plt.subplot(1, len(panels), index + 1)
+        for line in panel['lines']:
+            style = () if line.get('fmt') is None else (line['fmt'],)
+            plt.plot(line['x'], line['y'], *style, label=line.get('label'), color=line.get('color'))
+        plt.xlabel(panel['xlabel'])
+        plt.ylabel(panel['ylabel'])
+        plt.title(panel['title'])
+        if panel.get('legend'):
+            plt.legend(title=panel.get('legend_title'))
+        if panel.get('grid'):
+            plt.grid(True)
+    if len(panels) > 1:
+        plt.tight_layout()
+
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{spec['name']}_plot_{timestamp}.png")
+    plt.savefig(path, format='png')
+    if show:
+        plt.show()
+    plt.close(figure)
+    return path
+
+def render_results(lines, directory=DATA_DIR):
+    """Render every result record carrying a 'plot' spec, headless. Yields the saved paths."""
+    for number, line in enumerate(lines):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        spec = record.get('plot')
+        if spec is None:
+            continue
+        # Runs finish within the same second, so the run number keeps file names apart
+        timestamp = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_run{record.get('run', number)}"
+        yield render_plot(spec, directory, show=False, timestamp=timestamp)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render plots from batch results saved with `main.py <algorithm> --plot-data`.")
+    parser.add_argument('results', nargs='+', help="JSON Lines result files")
+    parser.add_argument('--output-dir', default=DATA_DIR, help="Where to write the PNG files (default: src/data)")
+    args = parser.parse_args(argv)
+
+    for results in args.results:
+        with open(results) as file:
+            for path in render_results(file, args.output_dir):
+                print(path)
+
+if __name__ == "__main__":
+    main()
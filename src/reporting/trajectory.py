@@ -0,0 +1,161 @@
+import os
+import random
+from array import array
+
+class TrajectoryRecorder:
+    """Bounded record of a per-step series, such as the objective value of every iteration.
+
+    At most capacity samples are kept in typed arrays, whatever the run length:
+
+    - 'every_k' keeps every k-th step and doubles k (dropping every other sample) when full
+    - 'minmax' keeps the lowest and highest value of each bucket of k steps, merging buckets pairwise when full
+    - 'reservoir' keeps a uniform random sample of the steps
+
+    With spill set to a file path, every value is also appended to that file as raw
+    machine values; full() maps it back with numpy.memmap for full-resolution analysis.
+    """
+
+    STRATEGIES = ('every_k', 'minmax', 'reservoir')
+    SPILL_CHUNK = 65536
+
+    def __init__(self, capacity=4096, strategy='every_k', typecode='d', spill=None, seed=0):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}'. Choose one of: {', '.join(self.STRATEGIES)}.")
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2.")
+        self.strategy = strategy
+        # minmax merges buckets in pairs
+        self.capacity = capacity + capacity % 2 if strategy == 'minmax' else capacity
+        self.typecode = typecode
+        self.steps = array('q')
+        self.values = array(typecode)
+        self.highs = array(typecode)
+        self.stride = 1
+        self.count = 0
+        self.first = None
+        self.last = None
+        # The reservoir draws from its own stream so recording never shifts a seeded search
+        self.rng = random.Random(seed)
+        self.spill = spill
+        self.spill_file = None
+        self.spill_buffer = array(typecode)
+        self.spilled = 0
+
+    def __len__(self):
+        """Number of steps recorded, not the number of samples kept."""
+        return self.count
+
+    def __getstate__(self):
+        # Open spill files do not cross process or checkpoint boundaries; flush and send the samples only
+        self.flush()
+        state = self.__dict__.copy()
+        state['spill_file'] = None
+        return state
+
+
+    def record(self, value):
+        step = self.count
+        self.count = step + 1
+        self.last = value
+        if step == 0:
+            self.first = value
+
+        if self.spill is not None:
+            self.spill_buffer.append(value)
+            if len(self.spill_buffer) >= self.SPILL_CHUNK:
+                self.flush()
+
+        if self.strategy == 'every_k':
+            if step % self.stride:
+                return
+            if len(self.values) == self.capacity:
+                # Halve the resolution: keep samples at even positions and double the stride
+                self.steps = self.steps[::2]
+                self.values = self.values[::2]
+                self.stride *= 2
+                if step % self.stride:
+                    return
+            self.steps.append(step)
+            self.values.append(value)
+        elif self.strategy == 'minmax':
+            if step // self.stride < len(self.values):
+                if value < self.values[-1]:
+                    self.values[-1] = value
+                elif value > self.highs[-1]:
+                    self.highs[-1] = value
+                return
+            if len(self.values) == self.capacity:
+                # Merge neighbouring buckets so each covers twice as many steps
+                self.steps = self.steps[::2]
+                self.values = array(self.typecode, map(min, self.values[::2], self.values[1::2]))
+                self.highs = array(self.typecode, map(max, self.highs[::2], self.highs[1::2]))
+                self.stride *= 2
+            self.steps.append(step)
+            self.values.append(value)
+            self.highs.append(value)
+        else:
+            if len(self.values) < self.capacity:
+                self.steps.append(step)
+                self.values.append(value)
+                return
+            slot = self.rng.randrange(step + 1)
+            if slot < self.capacity:
+                self.steps[slot] = step
+                self.values[slot] = value
+
+    def series(self):
+        """Return the kept samples as (steps, values) lists in step order, ready to plot.
+
+        minmax buckets contribute their low and their high at the bucket's first step,
+        which plots as a vertical bar spanning the bucket's range.
+        """
+        if self.strategy == 'minmax':
+            steps = [step for step in self.steps for _ in range(2)]
+            values = [value for pair in zip(self.values, self.highs) for value in pair]
+            return steps, values
+        if self.strategy == 'reservoir':
+            pairs = sorted(zip(self.steps, self.values))
+            return [step for step, _ in pairs], [value for _, value in pairs]
+        return list(self.steps), list(self.values)
+
+    def flush(self):
+        """Write buffered values to the spill file."""
+        if self.spill is None or not self.spill_buffer:
+            return
+        if self.spill_file is None:
+            # Opened on first use; a recorder restored from a checkpoint cuts off whatever
+            # was spilled after that checkpoint and carries on from there
+            self.spill_file = open(self.spill, 'r+b' if self.spilled else 'wb')
+            self.spill_file.truncate(self.spilled * self.spill_buffer.itemsize)
+            self.spill_file.seek(0, os.SEEK_END)
+        self.spill_buffer.tofile(self.spill_file)
+        self.spill_file.flush()
+        self.spilled += len(self.spill_buffer)
+        del self.spill_buffer[:]
+
+    def close(self):
+        """Flush and close the spill file; the kept samples stay readable."""
+        if self.spill_file is not None:
+            self.flush()
+            self.spill_file.close()
+            self.spill_file = None
+
+    def full(self):
+        """Memory-map the spilled full-resolution series, or return None when not spilling."""
+        if self.spill is None or self.count == 0:
+            return None
+        self.flush()
+        import numpy as np
+        return np.memmap(self.spill, dtype=np.dtype(self.typecode), mode='r', shape=(self.spilled,))
+
+
+def make_recorder(options, name, typecode='d'):
+    """Build a recorder for one named series from an algorithm's trajectory options.
+
+    options holds TrajectoryRecorder keyword arguments; its 'spill' entry is a directory
+    in which each series gets its own <name>.bin file.
+    """
+    options = dict(options or {})
+    spill_dir = options.pop('spill', None)
+    spill = None if spill_dir is None else os.path.join(spill_dir, f'{name}.bin')
+    return TrajectoryRecorder(typecode=typecode, spill=spill, **options)
@@ -0,0 +1,46 @@
+import pytest
+from algorithms.cooling import BUDGET_FINAL_TEMP, SCHEDULES
+from algorithms.simulated_annealing import SimulatedAnnealing
+from cube.cube import MagicCube
+
+FRACTIONS = (0.0, 0.001, 0.01, 0.1, 0.5, 0.9, 1.0)
+
+@pytest.mark.parametrize('name', ['geometric', 'linear', 'logarithmic', 'lundy-mees'])
+def test_budget_schedule_falls_from_initial_to_final_temperature(name):
+    schedule = SCHEDULES[name]()
+    schedule.start(1000.0, BUDGET_FINAL_TEMP)
+    temperatures = [schedule.at(fraction) for fraction in FRACTIONS]
+    assert temperatures[0] == pytest.approx(1000.0)
+    assert temperatures[-1] == pytest.approx(BUDGET_FINAL_TEMP)
+    assert all(a > b for a, b in zip(temperatures, temperatures[1:]))
+
+@pytest.mark.parametrize('name', ['logarithmic', 'lundy-mees'])
+def test_slow_schedules_stay_warm_early_in_the_budget(name):
+    schedule = SCHEDULES[name]()
+    schedule.start(1000.0, BUDGET_FINAL_TEMP)
+    # Still far above a swap delta after 0.1% of the budget, and within a few units of it at the end
+    assert schedule.at(0.001) > 100
+    assert schedule.at(0.1) > 5
+    assert schedule.at(0.9) < 2
+
+def test_annealing_defaults_final_temperature_to_the_budget_scale():
+    budgeted = SimulatedAnnealing(MagicCube(3), 1000, schedule='logarithmic', max_evaluations=1000)
+    unbudgeted = SimulatedAnnealing(MagicCube(3), 1000)
+    assert budgeted.final_temp == BUDGET_FINAL_TEMP
+    assert unbudgeted.final_temp == 1e-10
+
+def test_budget_schedule_without_budget_is_refused():
+    with pytest.raises(ValueError):
+        SimulatedAnnealing(MagicCube(3), 1000, schedule='lundy-mees')
+
+@pytest.mark.parametrize('accepted', [False, True])
+def test_adaptive_schedule_ends_at_final_temperature_over_a_budget(accepted):
+    schedule = SCHEDULES['adaptive']()
+    schedule.start(1000.0, BUDGET_FINAL_TEMP)
+    temp = 1000.0
+    steps = 20000
+    for step in range(1, steps + 1):
+        fraction = step / steps
+        temp = schedule.next_temperature(temp, accepted, False, fraction)
+        assert BUDGET_FINAL_TEMP <= temp <= 1000.0 * (BUDGET_FINAL_TEMP / 1000.0) ** (fraction * fraction) + 1e-9
+    assert temp == pytest.approx(BUDGET_FINAL_TEMP)